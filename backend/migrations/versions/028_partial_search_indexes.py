@@ -0,0 +1,41 @@
+"""Add partial search indexes covering only active, non-archived products.
+
+The storefront search always filters on is_active AND archived_at IS NULL.
+Partial GIN indexes restricted to that predicate are smaller than the
+full-table ones and never return rows the filter would discard. The full
+indexes stay in place for admin searches that include inactive or archived
+products.
+
+Revision ID: 028
+Revises: 027
+Create Date: 2026-02-23
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "028"
+down_revision: Union[str, None] = "027"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_products_search_live ON products "
+        "USING GIN(search_vector) WHERE is_active AND archived_at IS NULL"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_products_name_trgm_live ON products "
+        "USING GIN(name gin_trgm_ops) WHERE is_active AND archived_at IS NULL"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_products_brand_trgm_live ON products "
+        "USING GIN(brand gin_trgm_ops) WHERE is_active AND archived_at IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_products_brand_trgm_live")
+    op.execute("DROP INDEX IF EXISTS idx_products_name_trgm_live")
+    op.execute("DROP INDEX IF EXISTS idx_products_search_live")
@@ -0,0 +1,39 @@
+"""Index purchase review search: description tsvector and user name trigrams.
+
+Adds a generated description_tsv column with a GIN index for the review
+description search, plus a trigram GIN index on users.display_name so
+substring name searches no longer scan the users table.
+
+Revision ID: 029
+Revises: 028
+Create Date: 2026-02-23
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "029"
+down_revision: Union[str, None] = "028"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE hibob_purchase_reviews ADD COLUMN IF NOT EXISTS description_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(description, ''))) STORED"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_hibob_purchase_reviews_description_tsv "
+        "ON hibob_purchase_reviews USING GIN(description_tsv)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_users_display_name_trgm "
+        "ON users USING GIN(display_name gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_users_display_name_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_hibob_purchase_reviews_description_tsv")
+    op.execute("ALTER TABLE hibob_purchase_reviews DROP COLUMN IF EXISTS description_tsv")
@@ -0,0 +1,31 @@
+"""Index orders by user and recency for keyset paging.
+
+The user detail view reads a user's newest orders ordered by
+(created_at, id); this composite index serves that directly and supersedes
+the plain user_id index.
+
+Revision ID: 030
+Revises: 029
+Create Date: 2026-02-24
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "030"
+down_revision: Union[str, None] = "029"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_orders_user_created "
+        "ON orders (user_id, created_at DESC, id DESC)"
+    )
+    op.execute("DROP INDEX IF EXISTS idx_orders_user")
+
+
+def downgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS idx_orders_user ON orders (user_id)")
+    op.execute("DROP INDEX IF EXISTS idx_orders_user_created")
@@ -0,0 +1,28 @@
+"""Partial index on active users' departments.
+
+Serves the department filter list (SELECT DISTINCT department of active
+users) with an index-only scan.
+
+Revision ID: 031
+Revises: 030
+Create Date: 2026-02-24
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "031"
+down_revision: Union[str, None] = "030"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_users_active_department "
+        "ON users (department) WHERE is_active AND department IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_users_active_department")
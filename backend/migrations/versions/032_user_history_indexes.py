@@ -0,0 +1,34 @@
+"""Index user history by recency for the user detail view.
+
+The detail view reads a user's newest manual budget adjustments and HiBob
+purchase reviews with a LIMIT; these indexes let both stop after the
+requested rows instead of sorting everything the user has.
+
+Revision ID: 032
+Revises: 031
+Create Date: 2026-02-24
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "032"
+down_revision: Union[str, None] = "031"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_budget_adjustments_user_created "
+        "ON budget_adjustments (user_id, created_at DESC) WHERE source <> 'hibob'"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_hibob_purchase_reviews_user_entry "
+        "ON hibob_purchase_reviews (user_id, entry_date DESC)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_hibob_purchase_reviews_user_entry")
+    op.execute("DROP INDEX IF EXISTS idx_budget_adjustments_user_created")
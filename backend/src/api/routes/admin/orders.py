@@ -71,7 +71,7 @@ async def export_orders_csv(
     max_rows = get_setting_int("max_csv_export_rows", 10000)
     items, _ = await order_service.get_orders(
         db, status=status, q=q, page=1, per_page=max_rows,
-        date_from=date_from, date_to=date_to,
+        date_from=date_from, date_to=date_to, with_total=False,
     )
 
     output = io.StringIO()
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.dependencies.auth import get_current_user
 from src.api.dependencies.database import get_db
-from src.models.dto.product import ProductListItem, ProductListResponse, ProductResponse
+from src.models.dto.product import ProductListResponse, ProductResponse
 from src.models.orm.user import User
 from src.services import product_service
 
@@ -27,10 +27,11 @@ async def list_products(
     archived_only: bool = False,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, max_length=500),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    result = await product_service.search_products(
+    return await product_service.search_products(
         db,
         q=q,
         category_id=category,
@@ -44,11 +45,8 @@ async def list_products(
         sort=sort,
         page=page,
         per_page=per_page,
+        cursor=cursor,
     )
-    result["items"] = [
-        ProductListItem.model_validate(p) for p in result["items"]
-    ]
-    return result
 
 
 @router.get("/suggestions")
@@ -1,3 +1,7 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from src.core.config import settings
@@ -16,3 +20,16 @@ async_session_factory = async_sessionmaker(
     class_=AsyncSession,
     expire_on_commit=False,
 )
+
+# Read-only loads that run alongside a request's own session (facets, the
+# admin user detail sections) share this cap. Past it they queue here rather
+# than at the pool, so they can take at most a third of its 30 connections.
+SIDE_SESSION_LIMIT = 10
+_side_sessions = asyncio.Semaphore(SIDE_SESSION_LIMIT)
+
+
+@asynccontextmanager
+async def side_session() -> AsyncIterator[AsyncSession]:
+    """Short-lived session for a read that runs concurrently with ``db``."""
+    async with _side_sessions, async_session_factory() as session:
+        yield session
@@ -1,4 +1,59 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from src.core.exceptions import BadRequestError
+
+
 def ilike_escape(q: str) -> str:
     """Escape special LIKE/ILIKE characters and wrap in wildcards."""
     escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
     return f"%{escaped}%"
+
+
+def cursor_scope(*filters: Any) -> str:
+    """Fingerprint of the filters a cursor was issued for."""
+    return hashlib.sha256(repr(filters).encode()).hexdigest()[:16]
+
+
+def encode_cursor(sort_value: Any, row_id: UUID, *, sort: str, scope: str) -> str:
+    """Encode a keyset pagination position as an opaque URL-safe token.
+
+    The token records the sort order and filter scope (see cursor_scope) it
+    belongs to, so it cannot be replayed against a different query.
+    """
+    if isinstance(sort_value, datetime):
+        kind, value = "dt", sort_value.isoformat()
+    else:
+        kind, value = "v", sort_value
+    payload = [sort, scope, kind, value, str(row_id)]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, *, sort: str, scope: str, value_type: type | tuple[type, ...],
+) -> tuple[Any, UUID]:
+    """Decode a token produced by encode_cursor into (sort_value, row_id).
+
+    Raises BadRequestError unless the token is well-formed, was issued for
+    the same ``sort`` and ``scope``, and holds a ``value_type`` sort value.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, cursor_scope_, kind, value, row_id = json.loads(raw)
+        if kind == "dt":
+            value = datetime.fromisoformat(value)
+        if (
+            cursor_sort != sort
+            or cursor_scope_ != scope
+            or isinstance(value, bool)
+            or not isinstance(value, value_type)
+        ):
+            raise ValueError("cursor does not match the query")
+        return value, UUID(row_id)
+    except (ValueError, TypeError):
+        raise BadRequestError("Invalid cursor")
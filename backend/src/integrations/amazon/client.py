@@ -46,7 +46,29 @@ def _parse_price_cents(price_str: str | None) -> int:
 
 
 class AmazonClient:
-    """Real ScraperAPI-backed Amazon client."""
+    """Real ScraperAPI-backed Amazon client.
+
+    Holds one pooled httpx client so repeated lookups reuse keep-alive
+    connections instead of paying DNS + TLS setup per request.
+    """
+
+    def __init__(self) -> None:
+        self._http: httpx.AsyncClient | None = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(
+                    max_connections=20, max_keepalive_connections=20, keepalive_expiry=75.0,
+                ),
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
 
     async def search(self, query: str) -> list[AmazonSearchResult]:
         params = {
@@ -56,10 +78,9 @@ class AmazonClient:
             "country_code": settings.amazon_country_code,
             "language": "en",
         }
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.get(f"{SCRAPER_BASE}/search", params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await self._client().get(f"{SCRAPER_BASE}/search", params=params, timeout=30.0)
+        resp.raise_for_status()
+        data = resp.json()
 
         logger.info("ScraperAPI search returned %d results for query=%r", len(data.get("results", [])), query)
 
@@ -94,10 +115,9 @@ class AmazonClient:
             "country_code": settings.amazon_country_code,
             "language": "en",
         }
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.get(f"{SCRAPER_BASE}/product", params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await self._client().get(f"{SCRAPER_BASE}/product", params=params, timeout=20.0)
+        resp.raise_for_status()
+        data = resp.json()
 
         if not data:
             logger.warning("ScraperAPI returned empty data for ASIN %s", asin)
@@ -240,3 +260,4 @@ class AmazonClient:
         return {asin: price for asin, price in results if price > 0}
 
 
+amazon_client = AmazonClient()
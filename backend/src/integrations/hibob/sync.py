@@ -13,6 +13,7 @@ from src.models.orm.user import User
 from src.repositories import user_repo
 from src.services.budget_service import calculate_total_budget_cents
 from src.services.settings_service import get_cached_settings
+from src.services.user_service import invalidate_departments_cache
 
 logger = logging.getLogger(__name__)
 
@@ -167,8 +168,7 @@ async def sync_employees(
         # Batch summary audit entry
         audit_user_id = admin_id
         if not audit_user_id:
-            staff = await user_repo.get_active_staff(db)
-            audit_user_id = staff[0].id if staff else None
+            audit_user_id = await user_repo.get_first_active_staff_id(db)
         if audit_user_id:
             await write_audit_log(
                 db,
@@ -192,4 +192,5 @@ async def sync_employees(
         logger.exception("HiBob sync failed")
 
     await db.flush()
+    invalidate_departments_cache()
     return log
@@ -36,6 +36,7 @@ from src.api.routes.admin import (
 )
 from src.audit.service import ensure_audit_partitions
 from src.core.config import settings
+from src.integrations.amazon.client import amazon_client
 from src.services.scheduler import start_scheduler, stop_scheduler
 from src.services.settings_service import load_settings, seed_defaults
 
@@ -75,6 +76,7 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     start_scheduler()
     yield
     stop_scheduler()
+    await amazon_client.aclose()
 
 
 app = FastAPI(
@@ -129,6 +129,7 @@ class ProductListResponse(BaseModel):
     total: int
     page: int
     per_page: int
+    next_cursor: str | None = None
     facets: dict[str, Any] | None = None
 
 
@@ -58,14 +58,37 @@ class BudgetSummary(BaseModel):
     available_cents: int
 
 
+class UserDetailAdjustment(BaseModel):
+    id: UUID
+    user_id: UUID
+    amount_cents: int
+    reason: str
+    created_by: UUID
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class UserDetailPurchaseReview(BaseModel):
+    id: UUID
+    entry_date: date
+    description: str
+    amount_cents: int
+    currency: str
+    status: str
+    matched_order_id: UUID | None = None
+
+    model_config = {"from_attributes": True}
+
+
 class UserDetailResponse(BaseModel):
     user: UserAdminResponse
     orders: list[OrderResponse] = []
-    adjustments: list[dict] = []
+    adjustments: list[UserDetailAdjustment] = []
     budget_summary: BudgetSummary
     budget_timeline: list[BudgetTimelineEntry] = []
     budget_overrides: list[UserBudgetOverrideResponse] = []
-    purchase_reviews: list[dict] = []
+    purchase_reviews: list[UserDetailPurchaseReview] = []
 
 
 class UserBudgetResponse(BaseModel):
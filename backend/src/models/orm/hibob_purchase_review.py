@@ -1,12 +1,16 @@
 import uuid
 from datetime import date, datetime
+from typing import TYPE_CHECKING
 
-from sqlalchemy import Date, DateTime, ForeignKey, Integer, String, Text, func
-from sqlalchemy.dialects.postgresql import JSONB, UUID
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Computed, Date, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.models.orm.base import Base
 
+if TYPE_CHECKING:
+    from src.models.orm.user import User
+
 
 class HiBobPurchaseReview(Base):
     __tablename__ = "hibob_purchase_reviews"
@@ -21,6 +25,11 @@ class HiBobPurchaseReview(Base):
     hibob_entry_id: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
     entry_date: Mapped[date] = mapped_column(Date, nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
+    description_tsv = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', coalesce(description, ''))", persisted=True),
+        deferred=True,
+    )
     amount_cents: Mapped[int] = mapped_column(Integer, nullable=False)
     currency: Mapped[str] = mapped_column(
         String(10), nullable=False, default="EUR", server_default="EUR"
@@ -47,3 +56,5 @@ class HiBobPurchaseReview(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+
+    user: Mapped["User"] = relationship("User", foreign_keys=[user_id], lazy="raise")
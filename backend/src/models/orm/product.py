@@ -59,3 +59,7 @@ class Product(Base):
         server_default=func.now(),
         onupdate=func.now(),
     )
+
+    # Fetch created_at/updated_at via RETURNING on INSERT and UPDATE so writes
+    # don't need a follow-up refresh() before the row is serialized.
+    __mapper_args__ = {"eager_defaults": True}
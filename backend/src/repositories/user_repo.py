@@ -1,17 +1,32 @@
+from collections.abc import Sequence
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from src.core.search import ilike_escape
 from src.models.orm.user import User
 
 
-async def get_by_id(db: AsyncSession, user_id: UUID) -> User | None:
-    result = await db.execute(select(User).where(User.id == user_id))
+async def get_by_id(
+    db: AsyncSession, user_id: UUID, *, only: Sequence[Any] = (),
+) -> User | None:
+    """Load a user; ``only`` restricts the loaded columns (see load_only)."""
+    stmt = select(User).where(User.id == user_id)
+    if only:
+        stmt = stmt.options(load_only(*only))
+    result = await db.execute(stmt)
     return result.scalar_one_or_none()
 
 
+async def get_columns(db: AsyncSession, user_id: UUID, *columns: Any) -> Row | None:
+    """Read just the given User columns for one user, without an ORM object."""
+    result = await db.execute(select(*columns).where(User.id == user_id))
+    return result.one_or_none()
+
+
 async def get_by_email(db: AsyncSession, email: str) -> User | None:
     result = await db.execute(select(User).where(User.email == email))
     return result.scalar_one_or_none()
@@ -36,6 +51,16 @@ async def get_active_staff(db: AsyncSession) -> list[User]:
     return list(result.scalars().all())
 
 
+async def get_first_active_staff_id(db: AsyncSession) -> UUID | None:
+    result = await db.execute(
+        select(User.id)
+        .where(User.is_active.is_(True), User.role.in_(("admin", "manager")))
+        .order_by(User.created_at)
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
 async def get_all(
     db: AsyncSession,
     *,
@@ -10,7 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import settings
 from src.core.exceptions import BadRequestError, NotFoundError
-from src.services.settings_service import get_setting, update_setting
+from src.services.settings_service import get_setting, update_settings
 
 logger = logging.getLogger(__name__)
 
@@ -181,29 +181,19 @@ async def update_schedule(
     if weekday is not None and not (0 <= weekday <= 6):
         raise BadRequestError("Weekday must be between 0 (Monday) and 6 (Sunday)")
 
+    values: dict[str, str] = {}
     if enabled is not None:
-        await update_setting(
-            db, "backup_schedule_enabled", str(enabled).lower(), updated_by=updated_by,
-        )
+        values["backup_schedule_enabled"] = str(enabled).lower()
     if frequency is not None:
-        await update_setting(
-            db, "backup_schedule_frequency", frequency, updated_by=updated_by,
-        )
+        values["backup_schedule_frequency"] = frequency
     if hour is not None:
-        await update_setting(
-            db, "backup_schedule_hour", str(hour), updated_by=updated_by,
-        )
+        values["backup_schedule_hour"] = str(hour)
     if minute is not None:
-        await update_setting(
-            db, "backup_schedule_minute", str(minute), updated_by=updated_by,
-        )
+        values["backup_schedule_minute"] = str(minute)
     if weekday is not None:
-        await update_setting(
-            db, "backup_schedule_weekday", str(weekday), updated_by=updated_by,
-        )
+        values["backup_schedule_weekday"] = str(weekday)
     if max_backups is not None:
-        await update_setting(
-            db, "backup_max_backups", str(max_backups), updated_by=updated_by,
-        )
+        values["backup_max_backups"] = str(max_backups)
+    await update_settings(db, values, updated_by=updated_by)
 
     return await get_schedule()
@@ -1,8 +1,9 @@
 import logging
+from collections.abc import Iterable, Mapping
 from datetime import date
 from uuid import UUID
 
-from sqlalchemy import select, func, update, or_, and_
+from sqlalchemy import ColumnElement, Select, select, func, update, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
 
@@ -19,7 +20,7 @@ logger = logging.getLogger(__name__)
 
 
 def calculate_total_budget_cents(
-    start_date: date | None, app_settings: dict[str, str] | None = None
+    start_date: date | None, app_settings: Mapping[str, str] | None = None
 ) -> int:
     if start_date is None or start_date > date.today():
         return 0
@@ -124,32 +125,52 @@ async def get_available_budget_cents(db: AsyncSession, user_id: UUID) -> int:
     return max(0, user.total_budget_cents + user.cached_adjustment_cents - user.cached_spent_cents)
 
 
+# Order statuses that count against a user's budget
+_SPENT_STATUSES = ("pending", "ordered", "delivered", "return_requested", "returned")
+
+
+def _live_spent_stmt(user_id: UUID | ColumnElement[UUID]) -> Select:
+    """Sum of the user's spending orders; pass ``User.id`` to correlate."""
+    return select(func.coalesce(func.sum(Order.total_cents), 0)).where(
+        Order.user_id == user_id,
+        Order.status.in_(_SPENT_STATUSES),
+    )
+
+
+def _live_adjustment_stmt(user_id: UUID | ColumnElement[UUID]) -> Select:
+    return select(func.coalesce(func.sum(BudgetAdjustment.amount_cents), 0)).where(
+        BudgetAdjustment.user_id == user_id
+    )
+
+
 async def get_live_spent_cents(db: AsyncSession, user_id: UUID) -> int:
     """Calculate actual spent from orders (pending + ordered + delivered + return_requested + returned)."""
-    result = await db.execute(
-        select(func.coalesce(func.sum(Order.total_cents), 0)).where(
-            Order.user_id == user_id,
-            Order.status.in_(["pending", "ordered", "delivered", "return_requested", "returned"]),
-        )
-    )
+    result = await db.execute(_live_spent_stmt(user_id))
     return result.scalar() or 0
 
 
 async def get_live_adjustment_cents(db: AsyncSession, user_id: UUID) -> int:
+    result = await db.execute(_live_adjustment_stmt(user_id))
+    return result.scalar() or 0
+
+
+async def get_live_totals_cents(db: AsyncSession, user_id: UUID) -> tuple[int, int]:
+    """Live spent and adjustment totals, as (spent, adjustments), in one query."""
     result = await db.execute(
-        select(func.coalesce(func.sum(BudgetAdjustment.amount_cents), 0)).where(
-            BudgetAdjustment.user_id == user_id
+        select(
+            _live_spent_stmt(user_id).scalar_subquery(),
+            _live_adjustment_stmt(user_id).scalar_subquery(),
         )
     )
-    return result.scalar() or 0
+    spent, adjustments = result.one()
+    return spent or 0, adjustments or 0
 
 
 async def get_live_available_cents(
     db: AsyncSession, user_id: UUID, total_budget_cents: int,
 ) -> int:
     """Calculate available budget from live (non-cached) spent and adjustment values."""
-    spent = await get_live_spent_cents(db, user_id)
-    adjustments = await get_live_adjustment_cents(db, user_id)
+    spent, adjustments = await get_live_totals_cents(db, user_id)
     return max(0, total_budget_cents + adjustments - spent)
 
 
@@ -171,6 +192,29 @@ async def refresh_budget_cache(db: AsyncSession, user_id: UUID) -> None:
     )
 
 
+async def refresh_budget_cache_many(db: AsyncSession, user_ids: Iterable[UUID]) -> None:
+    """Recalculate and store cached budget values for several users in one UPDATE."""
+    from datetime import datetime, timezone
+
+    ids = list(user_ids)
+    if not ids:
+        return
+
+    # The single-user totals, correlated to each updated row
+    spent = _live_spent_stmt(User.id).scalar_subquery()
+    adjustments = _live_adjustment_stmt(User.id).scalar_subquery()
+    await db.execute(
+        update(User)
+        .where(User.id.in_(ids))
+        .values(
+            cached_spent_cents=spent,
+            cached_adjustment_cents=adjustments,
+            budget_cache_updated_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
 async def check_budget_for_order(
     db: AsyncSession, user_id: UUID, order_total_cents: int
 ) -> bool:
@@ -184,19 +228,10 @@ async def check_budget_for_order(
 
     # User row is already locked above, which serialises concurrent checkouts.
     # Aggregate queries cannot use FOR UPDATE in PostgreSQL.
-    spent_result = await db.execute(
-        select(func.coalesce(func.sum(Order.total_cents), 0)).where(
-            Order.user_id == user_id,
-            Order.status.in_(["pending", "ordered", "delivered", "return_requested", "returned"]),
-        )
-    )
+    spent_result = await db.execute(_live_spent_stmt(user_id))
     spent = spent_result.scalar() or 0
 
-    adj_result = await db.execute(
-        select(func.coalesce(func.sum(BudgetAdjustment.amount_cents), 0)).where(
-            BudgetAdjustment.user_id == user_id
-        )
-    )
+    adj_result = await db.execute(_live_adjustment_stmt(user_id))
     adjustments = adj_result.scalar() or 0
 
     available = user.total_budget_cents + adjustments - spent
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.exceptions import BadRequestError, NotFoundError
 from src.models.orm.category import Category
 from src.models.orm.product import Product
+from src.services import product_service
 
 _cache: list | None = None
 _cache_time: float = 0
@@ -18,6 +19,8 @@ def invalidate_cache() -> None:
     global _cache, _cache_time
     _cache = None
     _cache_time = 0
+    # Category names are part of the cached search facets
+    product_service.invalidate_search_cache()
 
 
 async def list_all(db: AsyncSession) -> list[Category]:
@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import uuid as _uuid
+from collections.abc import Sequence
 from datetime import datetime, timezone
 from pathlib import Path
 from uuid import UUID
@@ -547,7 +548,13 @@ async def get_orders(
     include_invoices: bool = False,
     date_from: datetime | None = None,
     date_to: datetime | None = None,
-) -> tuple[list[dict], int]:
+    with_total: bool = True,
+) -> tuple[list[dict], int | None]:
+    """Return one page of orders and the total match count.
+
+    Callers that do not paginate pass ``with_total=False`` to skip the
+    count query; the total is then None.
+    """
     conditions = []
     if user_id:
         conditions.append(Order.user_id == user_id)
@@ -577,10 +584,12 @@ async def get_orders(
 
     where = and_(*conditions) if conditions else True
 
-    count_result = await db.execute(
-        select(func.count()).select_from(Order).where(where)
-    )
-    total = count_result.scalar() or 0
+    total = None
+    if with_total:
+        count_result = await db.execute(
+            select(func.count()).select_from(Order).where(where)
+        )
+        total = count_result.scalar() or 0
 
     # Sorting
     order_clause = Order.created_at.desc()  # default: newest
@@ -605,6 +614,41 @@ async def get_orders(
     result = await db.execute(query)
     orders = result.scalars().unique().all()
 
+    return await _orders_to_dicts(db, orders, include_invoices), total
+
+
+async def get_recent_orders(
+    db: AsyncSession,
+    user_id: UUID,
+    *,
+    limit: int = 100,
+    before: tuple[datetime, UUID] | None = None,
+) -> list[dict]:
+    """Return a user's newest orders, without a total count.
+
+    Pages by keyset on ``(created_at, id)``: pass the last order's
+    ``(created_at, id)`` as ``before`` to continue after it.
+    """
+    query = (
+        select(Order)
+        .options(selectinload(Order.items))
+        .where(Order.user_id == user_id)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit)
+    )
+    if before is not None:
+        query = query.where(
+            sa.tuple_(Order.created_at, Order.id) < sa.tuple_(*before)
+        )
+
+    result = await db.execute(query)
+    orders = result.scalars().unique().all()
+    return await _orders_to_dicts(db, orders)
+
+
+async def _orders_to_dicts(
+    db: AsyncSession, orders: Sequence[Order], include_invoices: bool = False,
+) -> list[dict]:
     # Batch-fetch product names and user info
     order_user_ids = {o.user_id for o in orders}
     product_ids = {item.product_id for o in orders for item in o.items}
@@ -637,7 +681,7 @@ async def get_orders(
         )
         result_list.append(order_to_dict(order, user, order_items, invoices))
 
-    return result_list, total
+    return result_list
 
 
 async def update_order_item_check(
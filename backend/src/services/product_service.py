@@ -1,28 +1,54 @@
 import asyncio
+import copy
 import logging
-import re
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
 from uuid import UUID
 
-from sqlalchemy import select, func, and_, or_, literal_column
+from cachetools import TTLCache
+from sqlalchemy import Integer, any_, select, func, and_, or_, column, literal_column, tuple_, type_coerce, update, values
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID, aggregate_order_by, insert as pg_insert
 from sqlalchemy.exc import DataError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, load_only
 
 from src.core.config import settings
+from src.core.database import side_session
 from src.core.exceptions import BadRequestError, NotFoundError
-from src.core.search import ilike_escape
-from src.integrations.amazon.client import AmazonClient
-from src.models.dto.product import ProductFieldDiff, RefreshPreviewResponse
+from src.core.search import cursor_scope, decode_cursor, encode_cursor, ilike_escape
+from src.integrations.amazon.client import AmazonClient, amazon_client as shared_amazon_client
+from src.integrations.amazon.models import AmazonVariant
+from src.models.dto.product import ProductFieldDiff, ProductListItem, RefreshPreviewResponse
 from src.models.orm.brand import Brand
 from src.models.orm.product import Product
 from src.models.orm.category import Category
-from typing import Any
 
 from src.services.image_service import download_and_store_product_images
 
 logger = logging.getLogger(__name__)
 
 _price_refresh_lock = asyncio.Lock()
+_PRICE_UPDATE_CHUNK_SIZE = 1000
+_PRICE_REFRESH_CONCURRENCY = 20
+
+# First-page search responses, keyed by the normalized filter set. Cleared on
+# product writes in this process; the TTL bounds staleness across workers.
+_SEARCH_CACHE_TTL = 60  # seconds
+_search_cache: TTLCache[tuple, dict] = TTLCache(maxsize=512, ttl=_SEARCH_CACHE_TTL)
+
+
+# Facets only depend on the catalog itself, so a single cached payload serves
+# every search.
+_facets_cache: dict | None = None
+_facets_cached_at: float = 0
+
+
+def invalidate_search_cache() -> None:
+    global _facets_cache, _facets_cached_at
+    _search_cache.clear()
+    _facets_cache = None
+    _facets_cached_at = 0
 
 REFRESHABLE_FIELDS = {
     "name": "Name",
@@ -74,39 +100,243 @@ SEARCH_SYNONYMS: dict[str, list[str]] = {
 }
 
 
+# Deletes ASCII non-word characters (which include every tsquery operator);
+# str.translate scans in C instead of running a regex per word.
+_STRIP_NON_WORD = str.maketrans(
+    "", "", "".join(c for c in map(chr, range(128)) if not (c.isalnum() or c == "_"))
+)
+
+
+def _build_synonym_trie(synonyms: dict[str, list[str]]) -> dict:
+    """Build a token-level trie over the (possibly multi-word) synonym keys.
+
+    A node's ``""`` entry holds the rendered tsquery OR-group for the phrase
+    ending there, e.g. ``"(ssd | solid <-> state <-> drive)"``, so expansion
+    is a lookup rather than string building per request.
+    """
+    trie: dict = {}
+    for phrase, alternatives in synonyms.items():
+        node = trie
+        for token in phrase.split():
+            node = node.setdefault(token, {})
+        node[""] = "(" + " | ".join(" <-> ".join(p.split()) for p in (phrase, *alternatives)) + ")"
+    return trie
+
+
+_SYNONYM_TRIE = _build_synonym_trie(SEARCH_SYNONYMS)
+
+
 def _build_prefix_tsquery(q: str) -> str | None:
     """Build a tsquery string with prefix matching on the last term.
 
     E.g. "wire key" -> "wire & key:*"
     """
-    words = q.strip().split()
-    if not words:
-        return None
     # Sanitize: keep only alphanumeric chars per word
-    sanitized = [re.sub(r"[^\w]", "", w) for w in words]
-    sanitized = [w for w in sanitized if w]
+    sanitized = [w for w in (w.translate(_STRIP_NON_WORD) for w in q.split()) if w]
     if not sanitized:
         return None
-    if len(sanitized) == 1:
-        return f"{sanitized[0]}:*"
-    return " & ".join(sanitized[:-1]) + f" & {sanitized[-1]}:*"
+    sanitized[-1] += ":*"
+    return " & ".join(sanitized)
 
 
-def _expand_with_synonyms(q: str) -> str:
-    """Expand query terms with known synonyms using OR.
+def _expand_with_synonyms(q: str) -> tuple[str, bool]:
+    """Expand query terms with known synonyms into a to_tsquery expression.
 
-    E.g. "notebook case" -> "notebook | laptop case"
+    Synonym phrases are matched greedily (longest first) against the token
+    trie, so multi-word entries work in both directions. Returns the
+    expression and whether any synonym was actually found.
+    E.g. "notebook case" -> ("(notebook | laptop) & case", True),
+         "ssd" -> ("(ssd | solid <-> state <-> drive)", True)
     """
-    words = q.lower().strip().split()
-    expanded_parts: list[str] = []
-    for word in words:
-        clean = re.sub(r"[^\w]", "", word)
-        if clean in SEARCH_SYNONYMS:
-            group = [clean] + SEARCH_SYNONYMS[clean]
-            expanded_parts.append("(" + " | ".join(group) + ")")
+    tokens = [t for t in (w.translate(_STRIP_NON_WORD) for w in q.lower().split()) if t]
+    parts: list[str] = []
+    hit = False
+    i = 0
+    while i < len(tokens):
+        node = _SYNONYM_TRIE
+        match: tuple[int, str] | None = None
+        j = i
+        while j < len(tokens) and tokens[j] in node:
+            node = node[tokens[j]]
+            j += 1
+            if "" in node:
+                match = (j, node[""])
+        if match:
+            hit = True
+            i, group = match
+            parts.append(group)
         else:
-            expanded_parts.append(clean)
-    return " ".join(expanded_parts)
+            parts.append(tokens[i])
+            i += 1
+    return " & ".join(parts), hit
+
+
+def _jsonb_array(order_by, **fields):
+    """Scalar subquery aggregating rows into a JSONB array of objects (``[]`` when empty)."""
+    obj = func.jsonb_build_object(*(x for item in fields.items() for x in item))
+    return select(
+        func.coalesce(
+            func.jsonb_agg(aggregate_order_by(obj, order_by)),
+            literal_column("'[]'::jsonb"),
+        )
+    ).scalar_subquery()
+
+
+def _build_facets_query():
+    """Build one statement returning every storefront facet as a single JSONB object.
+
+    Facets cover all active products regardless of the current filters, so
+    the statement has no parameters and is built once at import.
+    """
+    active = Product.is_active.is_(True)
+    count = func.count().label("count")
+
+    brands = (
+        select(Product.brand.label("value"), count)
+        .where(active, Product.brand.isnot(None))
+        .group_by(Product.brand)
+        .subquery()
+    )
+    categories = (
+        select(Category.id, Category.slug, Category.name, func.count(Product.id).label("count"))
+        .join(Product, Product.category_id == Category.id)
+        .where(active)
+        .group_by(Category.id, Category.slug, Category.name)
+        .subquery()
+    )
+    colors = (
+        select(Product.color.label("value"), count)
+        .where(active, Product.color.isnot(None))
+        .group_by(Product.color)
+        .order_by(count.desc())
+        .limit(20)
+        .subquery()
+    )
+    materials = (
+        select(Product.material.label("value"), count)
+        .where(active, Product.material.isnot(None))
+        .group_by(Product.material)
+        .order_by(count.desc())
+        .limit(20)
+        .subquery()
+    )
+
+    price_range = select(
+        func.jsonb_build_object(
+            "min_cents", func.coalesce(func.min(Product.price_cents), 0),
+            "max_cents", func.coalesce(func.max(Product.price_cents), 0),
+        )
+    ).where(active).scalar_subquery()
+
+    return select(
+        type_coerce(
+            func.jsonb_build_object(
+                "brands", _jsonb_array(
+                    brands.c.value, value=brands.c.value, count=brands.c.count,
+                ),
+                "categories", _jsonb_array(
+                    categories.c.count.desc(),
+                    id=categories.c.id, slug=categories.c.slug,
+                    name=categories.c.name, count=categories.c.count,
+                ),
+                "colors", _jsonb_array(
+                    colors.c.count.desc(), value=colors.c.value, count=colors.c.count,
+                ),
+                "materials", _jsonb_array(
+                    materials.c.count.desc(), value=materials.c.value, count=materials.c.count,
+                ),
+                "price_range", price_range,
+            ),
+            JSONB,
+        )
+    )
+
+
+_FACETS_QUERY = _build_facets_query()
+
+
+def _cached_facets() -> dict | None:
+    if _facets_cache is not None and (time.monotonic() - _facets_cached_at) < _SEARCH_CACHE_TTL:
+        return _facets_cache
+    return None
+
+
+async def _load_facets() -> dict:
+    global _facets_cache, _facets_cached_at
+    now = time.monotonic()
+    if _facets_cache is not None and (now - _facets_cached_at) < _SEARCH_CACHE_TTL:
+        return _facets_cache
+    async with side_session() as session:
+        facets = (await session.execute(_FACETS_QUERY)).scalar_one()
+    _facets_cache = facets
+    _facets_cached_at = now
+    return facets
+
+
+def _matches_csv(column, csv: str):
+    """Match a column against a comma-separated value list, split by Postgres.
+
+    Keeps one statement shape (and cached plan) however many values are selected.
+    """
+    return column == any_(func.regexp_split_to_array(func.btrim(csv), r"\s*,\s*"))
+
+
+def _similarity_threshold(q: str) -> float:
+    """Minimum trigram similarity for a fuzzy match, stricter for short queries.
+
+    A short query shares a few trigrams with a large share of the catalog,
+    so the pg_trgm default of 0.3 lets it match (and recheck) far too many rows.
+    """
+    length = len(q.strip())
+    if length < 10:
+        return 0.6
+    if length < 30:
+        return 0.45
+    return 0.3
+
+
+def _trigram_matches(q: str) -> list:
+    """Fuzzy name/brand matches using the pg_trgm ``%`` operator.
+
+    Unlike ``similarity(...) > x``, ``%`` can be answered from the
+    idx_products_name_trgm / idx_products_brand_trgm GIN indexes. It compares
+    against ``pg_trgm.similarity_threshold`` (default 0.3); when the query
+    calls for a stricter threshold, an explicit similarity() check narrows
+    the index candidates.
+    """
+    threshold = _similarity_threshold(q)
+    matches = []
+    for col in (Product.name, Product.brand):
+        match = col.op("%")(q)
+        if threshold > 0.3:
+            match = and_(match, func.similarity(col, q) > threshold)
+        matches.append(match)
+    return matches
+
+
+# Last-term length up to which search still adds a prefix (:*) query
+_PREFIX_MAX_TERM_LENGTH = 6
+
+# Product columns hydrated by search_products: exactly what the list view renders
+_LIST_ITEM_FIELDS = tuple(ProductListItem.model_fields)
+
+
+@lru_cache(maxsize=8192)
+def _compile_search_terms(q: str) -> tuple[str | None, str | None]:
+    """Return (prefix tsquery or None, synonym tsquery or None) for a search string.
+
+    The prefix query is only worth its extra GIN probe while the last term
+    still looks half-typed; a longer final word is matched by the websearch
+    query already.
+
+    Cached per process: search traffic is dominated by a small set of
+    popular queries, so the string work is done once per distinct query.
+    """
+    expanded, has_synonyms = _expand_with_synonyms(q)
+    prefix = _build_prefix_tsquery(q)
+    if prefix and len(prefix.rpartition(" & ")[2]) - len(":*") > _PREFIX_MAX_TERM_LENGTH:
+        prefix = None
+    return prefix, expanded if has_synonyms else None
 
 
 async def search_products(
@@ -125,7 +355,20 @@ async def search_products(
     sort: str = "relevance",
     page: int = 1,
     per_page: int = 20,
+    cursor: str | None = None,
 ) -> dict:
+    filters = (
+        " ".join(q.lower().split()) if q else None,
+        category_id, brand, color, material, price_min, price_max,
+        is_active, include_archived, archived_only,
+    )
+    cache_key: tuple | None = None
+    if page == 1 and cursor is None:
+        cache_key = (*filters, sort, per_page)
+        cached = _search_cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
     conditions = []
 
     if archived_only:
@@ -133,25 +376,26 @@ async def search_products(
     elif not include_archived:
         conditions.append(Product.archived_at.is_(None))
 
-    # Don't filter by is_active when viewing archived products
+    # Don't filter by is_active when viewing archived products. The flag is
+    # inlined rather than bound so the planner can match the partial
+    # "WHERE is_active AND archived_at IS NULL" search indexes.
     if is_active is not None and not archived_only:
-        conditions.append(Product.is_active == is_active)
+        conditions.append(Product.is_active if is_active else ~Product.is_active)
     if category_id:
         conditions.append(Product.category_id == category_id)
     if brand:
-        brands = [b.strip() for b in brand.split(",")]
-        conditions.append(Product.brand.in_(brands))
+        conditions.append(_matches_csv(Product.brand, brand))
     if color:
-        colors = [c.strip() for c in color.split(",")]
-        conditions.append(Product.color.in_(colors))
+        conditions.append(_matches_csv(Product.color, color))
     if material:
-        materials = [m.strip() for m in material.split(",")]
-        conditions.append(Product.material.in_(materials))
+        conditions.append(_matches_csv(Product.material, material))
     if price_min is not None:
         conditions.append(Product.price_cents >= price_min * 100)
     if price_max is not None:
         conditions.append(Product.price_cents <= price_max * 100)
 
+    prefix_expr, synonym_expr = _compile_search_terms(q) if q else (None, None)
+
     if q:
         try:
             search_conditions: list = []
@@ -163,176 +407,151 @@ async def search_products(
                 search_conditions.append(Product.name.ilike(pattern))
                 search_conditions.append(Product.brand.ilike(pattern))
             else:
-                # Strategy 1: websearch_to_tsquery — supports AND, OR, -exclude, "phrases"
-                ws_query = func.websearch_to_tsquery("english", q)
-                search_conditions.append(Product.search_vector.op("@@")(ws_query))
-
-                # Strategy 2: Prefix query for partial typing / autocomplete
-                prefix_expr = _build_prefix_tsquery(q)
+                # Strategy 1: websearch_to_tsquery — supports AND, OR, -exclude, "phrases".
+                # Strategy 3: Synonym expansion is OR-ed into the same tsquery
+                # (tsquery || tsquery) so both share one GIN probe.
+                text_query = func.websearch_to_tsquery("english", q)
+                if synonym_expr:
+                    text_query = text_query.op("||")(func.to_tsquery("english", synonym_expr))
+                search_conditions.append(Product.search_vector.op("@@")(text_query))
+
+                # Strategy 2: Prefix query for partial typing / autocomplete.
+                # Category names live in search_vector (weight A, kept fresh by
+                # trg_categories_name_update), so strategies 1-2 cover them too.
                 if prefix_expr:
                     prefix_query = func.to_tsquery("english", prefix_expr)
                     search_conditions.append(
                         Product.search_vector.op("@@")(prefix_query)
                     )
 
-                # Strategy 3: Synonym expansion
-                expanded = _expand_with_synonyms(q)
-                if expanded.lower() != q.lower().strip():
-                    syn_query = func.plainto_tsquery("english", expanded)
-                    search_conditions.append(
-                        Product.search_vector.op("@@")(syn_query)
-                    )
-
-                # Strategy 4: Category name subquery (ILIKE + similarity)
-                search_conditions.append(Product.category_id.in_(
-                    select(Category.id).where(
-                        or_(
-                            Category.name.ilike(ilike_escape(q)),
-                            func.similarity(Category.name, q) > 0.3,
-                        )
-                    )
-                ))
-
-                # Strategy 5: Trigram similarity (threshold 0.3)
-                search_conditions.append(func.similarity(Product.name, q) > 0.3)
-                search_conditions.append(func.similarity(Product.brand, q) > 0.3)
+                # Strategy 5: Trigram similarity
+                search_conditions.extend(_trigram_matches(q))
 
             conditions.append(or_(*search_conditions))
         except DataError:
             logger.warning("Malformed search query %r, falling back to similarity", q)
-            conditions.append(
-                or_(
-                    func.similarity(Product.name, q) > 0.3,
-                    func.similarity(Product.brand, q) > 0.3,
-                )
-            )
+            conditions.append(or_(*_trigram_matches(q)))
 
     where = and_(*conditions) if conditions else True
 
-    count_result = await db.execute(
-        select(func.count()).select_from(Product).where(where)
-    )
-    total = count_result.scalar() or 0
-
-    query = select(Product).where(where)
-
+    # value_type is what a cursor's sort value must be for this sort key
+    descending = True
     if sort == "price_asc":
-        query = query.order_by(Product.price_cents.asc())
+        sort_key, descending, value_type = Product.price_cents, False, int
     elif sort == "price_desc":
-        query = query.order_by(Product.price_cents.desc())
+        sort_key, value_type = Product.price_cents, int
     elif sort == "name_asc":
-        query = query.order_by(Product.name.asc())
+        sort_key, descending, value_type = Product.name, False, str
     elif sort == "newest":
-        query = query.order_by(Product.created_at.desc())
+        sort_key, value_type = Product.created_at, datetime
     elif q and sort == "relevance":
+        value_type = (int, float)
         if len(q.strip()) <= 2:
             # For very short queries, rank by name similarity only
-            name_sim = func.coalesce(func.similarity(Product.name, q), 0)
-            query = query.order_by(name_sim.desc())
+            sort_key = func.coalesce(func.similarity(Product.name, q), 0)
         else:
-            # Blended score: ts_rank * 2 + max(name_sim, brand_sim) + prefix_rank
+            # Blended score: ts_rank_cd * 2 + max(name_sim, brand_sim) + prefix_rank.
+            # Cover density ranking is cheaper than ts_rank and favours the
+            # short, adjacent-term matches typical of shop searches.
             ws_query = func.websearch_to_tsquery("english", q)
-            ts_rank = func.ts_rank(Product.search_vector, ws_query)
+            ts_rank = func.ts_rank_cd(Product.search_vector, ws_query)
             name_sim = func.coalesce(func.similarity(Product.name, q), 0)
             brand_sim = func.coalesce(func.similarity(Product.brand, q), 0)
             best_sim = func.greatest(name_sim, brand_sim)
 
             prefix_rank = literal_column("0")
-            prefix_expr = _build_prefix_tsquery(q)
             if prefix_expr:
                 prefix_tsq = func.to_tsquery("english", prefix_expr)
-                prefix_rank = func.ts_rank(Product.search_vector, prefix_tsq)
+                prefix_rank = func.ts_rank_cd(Product.search_vector, prefix_tsq)
 
-            blended = ts_rank * 2 + best_sim + prefix_rank
-            query = query.order_by(blended.desc())
+            sort_key = ts_rank * 2 + best_sim + prefix_rank
     else:
-        query = query.order_by(Product.created_at.desc())
-
-    query = query.offset((page - 1) * per_page).limit(per_page)
-    result = await db.execute(query)
-    products = list(result.scalars().all())
-
-    # Build facets concurrently
-    active_condition = Product.is_active.is_(True)
-
-    async def _brand_facets() -> list[dict[str, Any]]:
-        r = await db.execute(
-            select(Product.brand, func.count())
-            .where(active_condition)
-            .where(Product.brand.isnot(None))
-            .group_by(Product.brand)
-            .order_by(Product.brand)
-        )
-        return [{"value": b, "count": c} for b, c in r.all()]
-
-    async def _cat_facets() -> list[dict[str, Any]]:
-        r = await db.execute(
-            select(Category.id, Category.slug, Category.name, func.count(Product.id))
-            .join(Product, Product.category_id == Category.id)
-            .where(active_condition)
-            .group_by(Category.id, Category.slug, Category.name)
-            .order_by(func.count(Product.id).desc())
+        sort_key, value_type = Product.created_at, datetime
+
+    # The predicate is evaluated once: the total rides along as a window
+    # count and the sort key is exposed so the next page can continue from
+    # the last row (keyset) instead of scanning past an OFFSET.
+    #
+    # Only the columns rendered by ProductListItem are selected; the
+    # search_vector and the detail-only JSONB fields stay in the table.
+    ranked = (
+        select(
+            *(getattr(Product, name) for name in _LIST_ITEM_FIELDS),
+            sort_key.label("sort_key"),
+            func.count().over().label("total"),
         )
-        return [
-            {"id": str(cid), "slug": slug, "name": name, "count": cnt}
-            for cid, slug, name, cnt in r.all()
-        ]
-
-    async def _color_facets() -> list[dict[str, Any]]:
-        r = await db.execute(
-            select(Product.color, func.count())
-            .where(active_condition)
-            .where(Product.color.isnot(None))
-            .group_by(Product.color)
-            .order_by(func.count().desc())
-            .limit(20)
+        .where(where)
+        .subquery()
+    )
+    product_alias = aliased(Product, ranked)
+    query = select(product_alias, ranked.c.sort_key, ranked.c.total).options(
+        load_only(*(getattr(product_alias, name) for name in _LIST_ITEM_FIELDS))
+    )
+
+    if descending:
+        query = query.order_by(ranked.c.sort_key.desc(), ranked.c.id.desc())
+    else:
+        query = query.order_by(ranked.c.sort_key.asc(), ranked.c.id.asc())
+
+    scope = cursor_scope(*filters)
+    if cursor:
+        last_value, last_id = decode_cursor(
+            cursor, sort=sort, scope=scope, value_type=value_type,
         )
-        return [{"value": c, "count": cnt} for c, cnt in r.all()]
-
-    async def _material_facets() -> list[dict[str, Any]]:
-        r = await db.execute(
-            select(Product.material, func.count())
-            .where(active_condition)
-            .where(Product.material.isnot(None))
-            .group_by(Product.material)
-            .order_by(func.count().desc())
-            .limit(20)
+        position = tuple_(ranked.c.sort_key, ranked.c.id)
+        query = query.where(
+            position < tuple_(last_value, last_id)
+            if descending
+            else position > tuple_(last_value, last_id)
         )
-        return [{"value": m, "count": cnt} for m, cnt in r.all()]
+    else:
+        query = query.offset((page - 1) * per_page)
 
-    async def _price_range() -> dict[str, int]:
-        r = await db.execute(
-            select(func.min(Product.price_cents), func.max(Product.price_cents)).where(
-                active_condition
-            )
+    # Facets don't depend on the filters. On a facet-cache miss they load on
+    # a capped side session while the page query runs (a session can't run
+    # both at once); otherwise the request uses only its own connection.
+    facets = _cached_facets()
+    facets_task = asyncio.create_task(_load_facets()) if facets is None else None
+    try:
+        result = await db.execute(query.limit(per_page))
+        rows = result.all()
+        # Plain dicts rather than the ORM rows: the response may be cached and
+        # served to other requests long after this session is closed
+        products = [ProductListItem.model_validate(row[0]).model_dump() for row in rows]
+        if rows:
+            total = rows[0].total
+        elif page > 1 or cursor:
+            # Past the last row there is no row for the window count to ride on
+            total = (
+                await db.execute(select(func.count()).select_from(Product).where(where))
+            ).scalar_one()
+        else:
+            total = 0
+        next_cursor = (
+            encode_cursor(rows[-1].sort_key, rows[-1][0].id, sort=sort, scope=scope)
+            if len(rows) == per_page
+            else None
         )
-        row = r.one_or_none()
-        return {"min_cents": row[0] or 0, "max_cents": row[1] or 0} if row else {"min_cents": 0, "max_cents": 0}
-
-    # Execute sequentially — SQLAlchemy async sessions are NOT safe for
-    # concurrent use from multiple coroutines, so these cannot be run with
-    # asyncio.gather(). Each query shares the same `db` session, which
-    # maintains internal state (transaction, connection) that would race
-    # under concurrent access.
-    brands = await _brand_facets()
-    categories = await _cat_facets()
-    colors = await _color_facets()
-    materials = await _material_facets()
-    price_range = await _price_range()
-
-    return {
+
+        if facets_task is not None:
+            facets = await facets_task
+    except BaseException:
+        # Never leave the facet load running unawaited on its own session
+        if facets_task is not None:
+            facets_task.cancel()
+        raise
+
+    response = {
         "items": products,
         "total": total,
         "page": page,
         "per_page": per_page,
-        "facets": {
-            "brands": brands,
-            "categories": categories,
-            "colors": colors,
-            "materials": materials,
-            "price_range": price_range,
-        },
+        "next_cursor": next_cursor,
+        "facets": facets,
     }
+    if cache_key is not None:
+        _search_cache[cache_key] = copy.deepcopy(response)
+    return response
 
 
 async def get_suggestions(
@@ -369,7 +588,9 @@ async def get_suggestions(
 
 
 async def refresh_all_prices(
-    db: AsyncSession, amazon_client: AmazonClient | None = None,
+    db: AsyncSession,
+    amazon_client: AmazonClient | None = None,
+    concurrency: int = _PRICE_REFRESH_CONCURRENCY,
 ) -> dict:
     """Refresh prices for all products with amazon_asin."""
     if _price_refresh_lock.locked():
@@ -377,46 +598,66 @@ async def refresh_all_prices(
 
     async with _price_refresh_lock:
         if amazon_client is None:
-            amazon_client = AmazonClient()
-
-        result = await db.execute(
-            select(Product).where(Product.amazon_asin.isnot(None))
-        )
-        products = list(result.scalars().all())
+            amazon_client = shared_amazon_client
 
-        updated = 0
+        total = 0
         errors = 0
-        sem = asyncio.Semaphore(5)
-
-        # Step 1: Gather all price lookups concurrently (API calls only, no ORM mutations)
-        async def _fetch_price(product_id: UUID, asin: str) -> tuple[UUID, int | None]:
-            async with sem:
+        changes: list[tuple[UUID, int]] = []
+        # Bounded so streaming pauses while every worker is busy
+        queue: asyncio.Queue[tuple[UUID, str, int] | None] = asyncio.Queue(maxsize=concurrency * 2)
+
+        # Step 1: Look up prices with a fixed pool of workers (API calls only, no ORM mutations)
+        async def _worker() -> None:
+            nonlocal errors
+            while (item := await queue.get()) is not None:
+                product_id, asin, current_price = item
                 try:
                     new_price = await amazon_client.get_current_price(asin)
-                    return (product_id, new_price)
                 except Exception:
                     logger.exception("Failed to refresh price for product %s", product_id)
-                    raise
-
-        price_results = await asyncio.gather(
-            *[_fetch_price(p.id, p.amazon_asin) for p in products],
-            return_exceptions=True,
-        )
-
-        # Step 2: Apply ORM mutations sequentially on the session
-        products_by_id = {p.id: p for p in products}
-        for r in price_results:
-            if isinstance(r, Exception):
-                errors += 1
-            else:
-                product_id, new_price = r
-                product = products_by_id[product_id]
-                if new_price and new_price != product.price_cents:
-                    product.price_cents = new_price
-                    updated += 1
-
-        await db.flush()
-        return {"total": len(products), "updated": updated, "errors": errors}
+                    errors += 1
+                    continue
+                if new_price and new_price != current_price:
+                    changes.append((product_id, new_price))
+
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(concurrency):
+                tg.create_task(_worker())
+
+            # Stream only the columns we need; workers pick rows up as they arrive
+            result = await db.stream(
+                select(Product.id, Product.amazon_asin, Product.price_cents)
+                .where(Product.amazon_asin.isnot(None))
+                .execution_options(yield_per=500)
+            )
+            async for product_id, asin, price_cents in result:
+                total += 1
+                await queue.put((product_id, asin, price_cents))
+            for _ in range(concurrency):
+                await queue.put(None)
+
+        # Step 2: Write changed prices with one UPDATE per chunk
+        for start in range(0, len(changes), _PRICE_UPDATE_CHUNK_SIZE):
+            await _bulk_update_prices(db, changes[start:start + _PRICE_UPDATE_CHUNK_SIZE])
+        if changes:
+            invalidate_search_cache()
+
+        return {"total": total, "updated": len(changes), "errors": errors}
+
+
+async def _bulk_update_prices(db: AsyncSession, changes: list[tuple[UUID, int]]) -> None:
+    """Apply (product_id, price_cents) pairs in a single UPDATE ... FROM (VALUES ...)."""
+    new_prices = values(
+        column("id", PG_UUID(as_uuid=True)),
+        column("price_cents", Integer),
+        name="new_prices",
+    ).data(changes)
+    await db.execute(
+        update(Product)
+        .where(Product.id == new_prices.c.id)
+        .values(price_cents=new_prices.c.price_cents)
+        .execution_options(synchronize_session=False)
+    )
 
 
 # ── Product CRUD ─────────────────────────────────────────────────────────────
@@ -429,15 +670,15 @@ async def get_by_id(db: AsyncSession, product_id: UUID) -> Product:
 
 
 async def resolve_brand_id(db: AsyncSession, brand_name: str) -> UUID:
-    result = await db.execute(select(Brand).where(Brand.name == brand_name))
-    existing = result.scalar_one_or_none()
-    if existing:
-        return existing.id
+    """Return the brand id for a name, creating the brand in the same statement if missing."""
     slug = brand_name.lower().replace(" ", "-").replace(".", "")
-    new_brand = Brand(name=brand_name, slug=slug)
-    db.add(new_brand)
-    await db.flush()
-    return new_brand.id
+    stmt = pg_insert(Brand).values(name=brand_name, slug=slug)
+    # A no-op DO UPDATE (rather than DO NOTHING) makes RETURNING yield the existing row
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Brand.name], set_={"name": stmt.excluded.name},
+    ).returning(Brand.id)
+    result = await db.execute(stmt)
+    return result.scalar_one()
 
 
 async def create_product(
@@ -478,7 +719,7 @@ async def create_product(
     )
     db.add(product)
     await db.flush()
-    await db.refresh(product)
+    invalidate_search_cache()
     return product
 
 
@@ -512,7 +753,8 @@ async def update_product(
         changes["is_active"] = {"old": True, "new": False}
 
     await db.flush()
-    await db.refresh(product)
+    if changes:
+        invalidate_search_cache()
     return product, changes
 
 
@@ -522,7 +764,7 @@ async def set_active(db: AsyncSession, product_id: UUID, active: bool) -> Produc
         raise BadRequestError("Cannot activate product with price 0")
     product.is_active = active
     await db.flush()
-    await db.refresh(product)
+    invalidate_search_cache()
     return product
 
 
@@ -531,7 +773,7 @@ async def archive(db: AsyncSession, product_id: UUID) -> Product:
     product.archived_at = datetime.now(timezone.utc)
     product.is_active = False
     await db.flush()
-    await db.refresh(product)
+    invalidate_search_cache()
     return product
 
 
@@ -542,7 +784,7 @@ async def restore(db: AsyncSession, product_id: UUID) -> Product:
     product.archived_at = None
     product.is_active = True
     await db.flush()
-    await db.refresh(product)
+    invalidate_search_cache()
     return product
 
 
@@ -550,19 +792,27 @@ async def restore(db: AsyncSession, product_id: UUID) -> Product:
 
 
 async def enrich_from_amazon(
-    db: AsyncSession, product: Product, amazon_asin: str
+    db: AsyncSession, product: Product, amazon_asin: str,
+    amazon_client: AmazonClient | None = None,
 ) -> None:
     """Fetch Amazon data for a product and update images, specs, and variants."""
     try:
-        client = AmazonClient()
+        client = amazon_client or shared_amazon_client
         amazon_data = await client.get_product(amazon_asin)
         if amazon_data:
             main_image = amazon_data.images[0] if amazon_data.images else None
             gallery = amazon_data.images[1:] if len(amazon_data.images) > 1 else []
 
-            paths = await download_and_store_product_images(
-                product.id, main_image, gallery, settings.upload_dir, product.name,
+            # Image download and variant price lookup are independent requests
+            paths, prices = await asyncio.gather(
+                download_and_store_product_images(
+                    product.id, main_image, gallery, settings.upload_dir, product.name,
+                ),
+                _fetch_missing_variant_prices(client, amazon_data.variants),
+                return_exceptions=True,
             )
+            if isinstance(paths, BaseException):
+                raise paths
             product.image_url = paths.main_image
             product.image_gallery = paths.gallery
 
@@ -579,15 +829,12 @@ async def enrich_from_amazon(
             product.product_information = amazon_data.product_information
 
             if amazon_data.variants:
-                missing = [v.asin for v in amazon_data.variants if v.price_cents == 0]
-                if missing:
-                    try:
-                        prices = await client.get_variant_prices(missing)
-                        for v in amazon_data.variants:
-                            if v.asin in prices:
-                                v.price_cents = prices[v.asin]
-                    except Exception:
-                        logger.exception("Failed to fetch variant prices for product %s", product.id)
+                if isinstance(prices, BaseException):
+                    logger.error(
+                        "Failed to fetch variant prices for product %s", product.id, exc_info=prices,
+                    )
+                else:
+                    _apply_variant_prices(amazon_data.variants, prices)
 
                 product.variants = [v.model_dump() for v in amazon_data.variants]
                 variant_prices = [v.price_cents for v in amazon_data.variants if v.price_cents > 0]
@@ -596,21 +843,38 @@ async def enrich_from_amazon(
                     product.price_max_cents = max(variant_prices)
 
             await db.flush()
-            await db.refresh(product)
+            invalidate_search_cache()
     except Exception:
         logger.exception("Failed to auto-download images for product %s", product.id)
 
 
+async def _fetch_missing_variant_prices(
+    client: AmazonClient, variants: list[AmazonVariant],
+) -> dict[str, int]:
+    """Look up prices for variants that came back without one."""
+    missing = [v.asin for v in variants if v.price_cents == 0]
+    if not missing:
+        return {}
+    return await client.get_variant_prices(missing)
+
+
+def _apply_variant_prices(variants: list[AmazonVariant], prices: dict[str, int]) -> None:
+    for v in variants:
+        if v.asin in prices:
+            v.price_cents = prices[v.asin]
+
+
 async def generate_refresh_preview(
-    db: AsyncSession, product_id: UUID
+    db: AsyncSession, product_id: UUID,
+    amazon_client: AmazonClient | None = None,
 ) -> RefreshPreviewResponse:
     """Fetch fresh Amazon data and return a diff preview for the product."""
     product = await get_by_id(db, product_id)
     if not product.amazon_asin:
         raise BadRequestError("Product has no Amazon ASIN")
 
+    client = amazon_client or shared_amazon_client
     try:
-        client = AmazonClient()
         amazon_data = await client.get_product(product.amazon_asin)
     except Exception:
         logger.exception("ScraperAPI call failed for ASIN %s", product.amazon_asin)
@@ -623,46 +887,47 @@ async def generate_refresh_preview(
     main_image = amazon_data.images[0] if amazon_data.images else None
     gallery = amazon_data.images[1:] if len(amazon_data.images) > 1 else []
 
-    try:
-        paths = await download_and_store_product_images(
+    # Image download and variant price lookup are independent requests
+    paths, prices = await asyncio.gather(
+        download_and_store_product_images(
             product.id, main_image, gallery, settings.upload_dir, product.name,
-        )
+        ),
+        _fetch_missing_variant_prices(client, amazon_data.variants),
+        return_exceptions=True,
+    )
+
+    if isinstance(paths, BaseException):
+        logger.error("Image download failed for product %s", product.id, exc_info=paths)
+    else:
         product.image_url = paths.main_image
         product.image_gallery = paths.gallery
         images_updated = True
         await db.flush()
-    except Exception:
-        logger.exception("Image download failed for product %s", product.id)
+        invalidate_search_cache()
 
+    if isinstance(prices, BaseException):
+        logger.error("Failed to fetch variant prices", exc_info=prices)
+    else:
+        _apply_variant_prices(amazon_data.variants, prices)
+
+    # Snapshot both sides once, then diff only the fields Amazon actually supplied
+    old_values = {field: getattr(product, field) for field in REFRESHABLE_FIELDS}
+    new_values = {
+        field: value
+        for field in REFRESHABLE_FIELDS.keys() - {"variants"}
+        if (value := getattr(amazon_data, field, None)) is not None
+    }
     if amazon_data.variants:
-        variant_asins = [v.asin for v in amazon_data.variants if v.price_cents == 0]
-        if variant_asins:
-            try:
-                prices = await client.get_variant_prices(variant_asins)
-                for v in amazon_data.variants:
-                    if v.asin in prices:
-                        v.price_cents = prices[v.asin]
-            except Exception:
-                logger.exception("Failed to fetch variant prices")
-
-    diffs: list[ProductFieldDiff] = []
-    for field, label in REFRESHABLE_FIELDS.items():
-        if field == "variants":
-            new_variants = [v.model_dump() for v in amazon_data.variants] if amazon_data.variants else None
-            old_variants = product.variants
-            if new_variants and new_variants != old_variants:
-                diffs.append(ProductFieldDiff(
-                    field=field, label=label,
-                    old_value=old_variants, new_value=new_variants,
-                ))
-            continue
-        old_value = getattr(product, field)
-        new_value = getattr(amazon_data, field, None)
-        if new_value is not None and old_value != new_value:
-            diffs.append(ProductFieldDiff(
-                field=field, label=label,
-                old_value=old_value, new_value=new_value,
-            ))
+        new_values["variants"] = [v.model_dump() for v in amazon_data.variants]
+
+    diffs = [
+        ProductFieldDiff(
+            field=field, label=label,
+            old_value=old_values[field], new_value=new_values[field],
+        )
+        for field, label in REFRESHABLE_FIELDS.items()
+        if field in new_values and new_values[field] != old_values[field]
+    ]
 
     return RefreshPreviewResponse(
         product_id=product.id,
@@ -702,5 +967,5 @@ async def apply_refresh(
         product.brand_id = await resolve_brand_id(db, product.brand)
 
     await db.flush()
-    await db.refresh(product)
+    invalidate_search_cache()
     return product, changes
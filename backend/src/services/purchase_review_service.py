@@ -3,7 +3,7 @@ from uuid import UUID
 
 from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import aliased
+from sqlalchemy.orm import aliased, joinedload
 
 from src.core.exceptions import BadRequestError, NotFoundError
 from src.core.search import ilike_escape
@@ -33,10 +33,11 @@ async def list_reviews(
     if user_id:
         conditions.append(HiBobPurchaseReview.user_id == user_id)
     if q:
-        search = ilike_escape(q)
+        # Name fragments use the display_name trigram index; descriptions
+        # are matched word-wise against the generated description_tsv.
         conditions.append(
-            (UserTarget.display_name.ilike(search))
-            | (HiBobPurchaseReview.description.ilike(search))
+            (UserTarget.display_name.ilike(ilike_escape(q)))
+            | HiBobPurchaseReview.description_tsv.op("@@")(func.plainto_tsquery("simple", q))
         )
 
     base = (
@@ -46,11 +47,12 @@ async def list_reviews(
     if conditions:
         base = base.where(and_(*conditions))
 
-    count_q = (
-        select(func.count())
-        .select_from(HiBobPurchaseReview)
-        .join(UserTarget, HiBobPurchaseReview.user_id == UserTarget.id, isouter=True)
-    )
+    # The user join only filters when searching by display name
+    count_q = select(func.count()).select_from(HiBobPurchaseReview)
+    if q:
+        count_q = count_q.join(
+            UserTarget, HiBobPurchaseReview.user_id == UserTarget.id, isouter=True
+        )
     if conditions:
         count_q = count_q.where(and_(*conditions))
 
@@ -88,16 +90,20 @@ async def get_pending_count(db: AsyncSession) -> int:
     return result.scalar() or 0
 
 
-async def _reload_with_user(db: AsyncSession, review_id: UUID) -> dict:
-    UserTarget = aliased(User, name="user_target")
-    result = await db.execute(
-        select(HiBobPurchaseReview, UserTarget.display_name)
-        .join(UserTarget, HiBobPurchaseReview.user_id == UserTarget.id, isouter=True)
-        .where(HiBobPurchaseReview.id == review_id)
+async def _get_review_with_user(db: AsyncSession, review_id: UUID) -> HiBobPurchaseReview:
+    review = await db.get(
+        HiBobPurchaseReview, review_id, options=[joinedload(HiBobPurchaseReview.user)]
     )
-    row = result.one()
-    r, user_name = row
-    return {**_review_to_dict(r), "user_display_name": user_name}
+    if not review:
+        raise NotFoundError("Review not found")
+    return review
+
+
+def _review_with_user_name(review: HiBobPurchaseReview) -> dict:
+    return {
+        **_review_to_dict(review),
+        "user_display_name": review.user.display_name if review.user else None,
+    }
 
 
 async def match_review(
@@ -106,9 +112,7 @@ async def match_review(
     order_id: UUID,
     staff_id: UUID,
 ) -> dict:
-    review = await db.get(HiBobPurchaseReview, review_id)
-    if not review:
-        raise NotFoundError("Review not found")
+    review = await _get_review_with_user(db, review_id)
     if review.status != "pending":
         raise BadRequestError("Only pending reviews can be matched")
 
@@ -122,7 +126,7 @@ async def match_review(
     review.resolved_at = datetime.now(timezone.utc)
     await db.flush()
 
-    return await _reload_with_user(db, review_id)
+    return _review_with_user_name(review)
 
 
 async def adjust_review(
@@ -130,9 +134,7 @@ async def adjust_review(
     review_id: UUID,
     staff_id: UUID,
 ) -> dict:
-    review = await db.get(HiBobPurchaseReview, review_id)
-    if not review:
-        raise NotFoundError("Review not found")
+    review = await _get_review_with_user(db, review_id)
     if review.status != "pending":
         raise BadRequestError("Only pending reviews can be adjusted")
 
@@ -154,7 +156,7 @@ async def adjust_review(
     await db.flush()
 
     await refresh_budget_cache(db, review.user_id)
-    return await _reload_with_user(db, review_id)
+    return _review_with_user_name(review)
 
 
 async def dismiss_review(
@@ -162,9 +164,7 @@ async def dismiss_review(
     review_id: UUID,
     staff_id: UUID,
 ) -> dict:
-    review = await db.get(HiBobPurchaseReview, review_id)
-    if not review:
-        raise NotFoundError("Review not found")
+    review = await _get_review_with_user(db, review_id)
     if review.status != "pending":
         raise BadRequestError("Only pending reviews can be dismissed")
 
@@ -173,4 +173,4 @@ async def dismiss_review(
     review.resolved_at = datetime.now(timezone.utc)
     await db.flush()
 
-    return await _reload_with_user(db, review_id)
+    return _review_with_user_name(review)
@@ -1,10 +1,12 @@
 import asyncio
 import logging
 import re
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import date, datetime, timezone
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.audit.service import write_audit_log
@@ -14,18 +16,33 @@ from src.models.orm.hibob_purchase_review import HiBobPurchaseReview
 from src.models.orm.hibob_purchase_sync_log import HiBobPurchaseSyncLog
 from src.models.orm.order import Order
 from src.models.orm.user import User
-from src.services.budget_service import refresh_budget_cache
-from src.services.settings_service import get_setting, get_setting_int, load_settings
+from src.services.budget_service import refresh_budget_cache_many
+from src.services.settings_service import get_setting, get_setting_int, load_settings_if_stale
 
 logger = logging.getLogger(__name__)
 
+_CURRENCY_NOISE_RE = re.compile(r"[€$£\s]")
+
+# Upper bound on concurrent HiBob custom-table requests during a sync
+_MAX_IN_FLIGHT_FETCHES = 8
+
+# Users streamed and processed together during a purchase sync
+_USER_CHUNK_SIZE = 500
+
+# Order statuses a HiBob purchase can be matched against
+_ACTIVE_STATUSES = frozenset({"pending", "ordered", "delivered"})
+
+# Cross-worker guard so only one process runs a purchase sync at a time
+_SYNC_LOCK_KEY = func.hashtext("hibob_purchase_sync")
+
 
 def _parse_amount_cents(raw_value: str) -> int:
     """Parse amount string to cents. Handles '750.00', '750,00', '1.234,56'."""
     s = str(raw_value).strip()
 
-    # Remove currency symbols and whitespace
-    s = re.sub(r"[€$£\s]", "", s)
+    # Remove currency symbols and whitespace; plain numbers skip the regex
+    if not s.replace(".", "").replace(",", "").isdigit():
+        s = _CURRENCY_NOISE_RE.sub("", s)
 
     if not s:
         raise ValueError(f"Empty amount: {raw_value!r}")
@@ -50,6 +67,71 @@ def _parse_amount_cents(raw_value: str) -> int:
     return round(float(s) * 100)
 
 
+@dataclass(slots=True)
+class _ParsedEntry:
+    entry_date: date
+    description: str
+    amount_cents: int
+    currency: str
+
+
+def _parse_entry(
+    row: dict, col_date: str, col_description: str, col_amount: str, col_currency: str,
+) -> _ParsedEntry | None:
+    """Extract the configured columns from a HiBob row; None if it is unusable."""
+    entry_id = row.get("id", "")
+    try:
+        raw_date = row.get(col_date, "")
+        if isinstance(raw_date, str) and raw_date:
+            entry_date = date.fromisoformat(raw_date)
+        elif isinstance(raw_date, date):
+            entry_date = raw_date
+        else:
+            logger.warning("Skipping entry %s: no date", entry_id)
+            return None
+
+        description = str(row.get(col_description, ""))
+
+        # Handle HiBob compound amount fields: {"value": 270, "currency": "EUR"}
+        raw_amount_field = row.get(col_amount)
+        if isinstance(raw_amount_field, dict):
+            raw_val = raw_amount_field.get("value")
+            if raw_val is None:
+                logger.warning("Skipping entry %s: amount value is null", entry_id)
+                return None
+            raw_amount = str(raw_val)
+            currency = str(raw_amount_field.get("currency") or "EUR")
+        else:
+            if raw_amount_field is None:
+                logger.warning("Skipping entry %s: amount is null", entry_id)
+                return None
+            raw_amount = str(raw_amount_field)
+            currency = str(row.get(col_currency) or "EUR")
+        amount_cents = _parse_amount_cents(raw_amount)
+    except Exception:
+        logger.exception("Failed to parse entry %s", entry_id)
+        return None
+
+    return _ParsedEntry(entry_date, description, amount_cents, currency)
+
+
+def _parse_entries(
+    user_rows: dict[UUID, list[dict]],
+    col_date: str,
+    col_description: str,
+    col_amount: str,
+    col_currency: str,
+) -> dict[UUID, list[_ParsedEntry | None]]:
+    """Parse every user's rows, keeping each list aligned with its input rows."""
+    return {
+        user_id: [
+            _parse_entry(row, col_date, col_description, col_amount, col_currency)
+            for row in rows
+        ]
+        for user_id, rows in user_rows.items()
+    }
+
+
 def _find_matching_orders(
     orders: list[Order],
     amount_cents: int,
@@ -58,17 +140,97 @@ def _find_matching_orders(
     date_tolerance: int,
 ) -> list[Order]:
     """Find orders within tolerance for amount and date."""
+    entry_ordinal = entry_date.toordinal()
     matches = []
     for order in orders:
-        if order.status not in ("pending", "ordered", "delivered"):
+        if order.status not in _ACTIVE_STATUSES:
             continue
         amount_diff = abs(order.total_cents - amount_cents)
-        date_diff = abs((order.created_at.date() - entry_date).days)
+        date_diff = abs(order.created_at.toordinal() - entry_ordinal)
         if amount_diff <= amount_tolerance and date_diff <= date_tolerance:
             matches.append(order)
     return matches
 
 
+def _order_bucket(
+    amount_cents: int, day_ordinal: int, amount_tolerance: int, date_tolerance: int,
+) -> tuple[int, int]:
+    # Buckets are one tolerance window wide, so any order within tolerance
+    # of an entry sits in the entry's bucket or a direct neighbour.
+    return amount_cents // (amount_tolerance + 1), day_ordinal // (date_tolerance + 1)
+
+
+def _index_orders(
+    orders: list[Order], amount_tolerance: int, date_tolerance: int,
+) -> dict[tuple[int, int], list[Order]]:
+    """Bucket matchable orders by (amount, date) window for _candidate_orders."""
+    index: dict[tuple[int, int], list[Order]] = defaultdict(list)
+    for order in orders:
+        if order.status not in _ACTIVE_STATUSES:
+            continue
+        index[_order_bucket(
+            order.total_cents, order.created_at.toordinal(), amount_tolerance, date_tolerance,
+        )].append(order)
+    return index
+
+
+def _candidate_orders(
+    index: dict[tuple[int, int], list[Order]],
+    amount_cents: int,
+    entry_date: date,
+    amount_tolerance: int,
+    date_tolerance: int,
+) -> list[Order]:
+    """Orders from the 3x3 buckets around an entry; a superset of its matches."""
+    amount_bucket, date_bucket = _order_bucket(
+        amount_cents, entry_date.toordinal(), amount_tolerance, date_tolerance,
+    )
+    return [
+        order
+        for da in (-1, 0, 1)
+        for dd in (-1, 0, 1)
+        for order in index.get((amount_bucket + da, date_bucket + dd), ())
+    ]
+
+
+async def _fetch_custom_tables(
+    client: HiBobClientProtocol,
+    users: list[User],
+    table_id: str,
+    interval: float,
+) -> dict[UUID, list[dict]]:
+    """Fetch every user's custom table, starting one request per ``interval``.
+
+    Requests overlap instead of running back to back, so a slow response no
+    longer delays the next one while the request rate stays within the
+    configured HiBob budget. At most ``_MAX_IN_FLIGHT_FETCHES`` are open at once.
+    """
+    in_flight = asyncio.Semaphore(_MAX_IN_FLIGHT_FETCHES)
+
+    async def _fetch(user: User) -> tuple[UUID, list[dict]]:
+        try:
+            return user.id, await client.get_custom_table(user.hibob_id, table_id)
+        except Exception:
+            logger.warning(
+                "Failed to fetch custom table for user %s (hibob_id=%s)",
+                user.id, user.hibob_id,
+            )
+            return user.id, []
+        finally:
+            in_flight.release()
+
+    tasks: list[asyncio.Task] = []
+    async with asyncio.TaskGroup() as tg:
+        for i, user in enumerate(users):
+            # Space request starts to stay within HiBob rate limits
+            if i:
+                await asyncio.sleep(interval)
+            await in_flight.acquire()
+            tasks.append(tg.create_task(_fetch(user)))
+
+    return {user_id: rows for user_id, rows in (t.result() for t in tasks) if rows}
+
+
 async def sync_purchases(
     db: AsyncSession,
     client: HiBobClientProtocol,
@@ -83,9 +245,21 @@ async def sync_purchases(
         db.add(log)
         await db.flush()
 
+    # Transaction-scoped so it is released on commit/rollback even if the
+    # sync aborts; another worker holding it is already doing this work.
+    got_lock = (
+        await db.execute(select(func.pg_try_advisory_xact_lock(_SYNC_LOCK_KEY)))
+    ).scalar()
+    if not got_lock:
+        log.status = "skipped_locked"
+        log.completed_at = datetime.now(timezone.utc)
+        logger.warning("Purchase sync skipped — another worker is already syncing")
+        await db.flush()
+        return log
+
     try:
         # Reload settings from DB to handle multi-worker cache
-        await load_settings(db)
+        await load_settings_if_stale(db)
         table_id = get_setting("hibob_purchase_table_id")
         if not table_id:
             raise ValueError("HiBob purchase table not configured")
@@ -98,16 +272,6 @@ async def sync_purchases(
         date_tolerance = get_setting_int("hibob_date_tolerance_days")
         rate_limit_delay = get_setting_int("hibob_rate_limit_delay_ms") / 1000
 
-        # Fetch all active users with hibob_id
-        result = await db.execute(
-            select(User).where(
-                User.is_active.is_(True),
-                User.hibob_id.isnot(None),
-            )
-        )
-        users = list(result.scalars().all())
-        logger.info("Purchase sync: processing %d users", len(users))
-
         # Wipe previous sync results – HiBob is the source of truth.
         # Entries deleted in HiBob must not persist locally.
         # 1) Collect user IDs whose budgets were affected by old adjustments
@@ -131,148 +295,173 @@ async def sync_purchases(
         matched_count = 0
         auto_adjusted_count = 0
         pending_count = 0
-        affected_user_ids: set[UUID] = set()
-
-        # Fetch custom tables sequentially with delay to avoid HiBob rate limits
-        user_rows: dict[UUID, list[dict]] = {}
-        for i, user in enumerate(users):
-            try:
-                rows = await client.get_custom_table(user.hibob_id, table_id)
-                if rows:
-                    user_rows[user.id] = rows
-            except Exception:
-                logger.warning(
-                    "Failed to fetch custom table for user %s (hibob_id=%s)",
-                    user.id, user.hibob_id,
-                )
-            # Delay between requests to stay within HiBob rate limits
-            if i < len(users) - 1:
+        # Previous reviews were wiped above, so idempotency only has to hold
+        # within this run: hibob_entry_id is unique and a repeated entry
+        # would fail the whole sync. Only the ids are kept across chunks.
+        processed_entry_ids: set[str] = set()
+        affected_user_count = 0
+
+        users_processed = 0
+        first_user_id: UUID | None = None
+
+        # Stream active users with a hibob_id and process them chunk by chunk
+        users_result = await db.stream_scalars(
+            select(User)
+            .where(User.is_active.is_(True), User.hibob_id.isnot(None))
+            .execution_options(yield_per=_USER_CHUNK_SIZE)
+        )
+        async for users in users_result.partitions():
+            if users_processed:
+                # Keep HiBob request spacing across chunk boundaries
                 await asyncio.sleep(rate_limit_delay)
+            else:
+                first_user_id = users[0].id
+            users_processed += len(users)
 
-        logger.info("Purchase sync: fetched custom tables, %d users have entries", len(user_rows))
-
-        for user in users:
-            rows = user_rows.get(user.id)
-            if not rows:
-                continue
+            user_rows = await _fetch_custom_tables(client, users, table_id, rate_limit_delay)
 
-            # Pre-fetch user's orders for matching
-            order_result = await db.execute(
-                select(Order).where(
-                    Order.user_id == user.id,
-                    Order.status.in_(["pending", "ordered", "delivered"]),
-                )
+            logger.info(
+                "Purchase sync: fetched custom tables, %d of %d users have entries",
+                len(user_rows), len(users),
             )
-            user_orders = list(order_result.scalars().all())
 
-            for row in rows:
-                entry_id = str(row.get("id", ""))
-                if not entry_id:
-                    continue
+            # Field extraction is pure CPU work; keep it off the event loop
+            parsed = await asyncio.to_thread(
+                _parse_entries, user_rows, col_date, col_description, col_amount, col_currency,
+            )
 
-                entries_found += 1
+            adjustment_rows: list[dict] = []
+            review_rows: list[dict] = []
 
-                # Extract fields
-                try:
-                    raw_date = row.get(col_date, "")
-                    if isinstance(raw_date, str) and raw_date:
-                        entry_date = date.fromisoformat(raw_date)
-                    elif isinstance(raw_date, date):
-                        entry_date = raw_date
-                    else:
-                        logger.warning("Skipping entry %s: no date", entry_id)
-                        continue
+            # Pre-fetch matchable orders for the chunk's users in one query
+            orders_by_user: dict[UUID, list[Order]] = defaultdict(list)
+            if user_rows:
+                order_result = await db.execute(
+                    select(Order).where(
+                        Order.user_id.in_(list(user_rows)),
+                        Order.status.in_(_ACTIVE_STATUSES),
+                    )
+                )
+                for order in order_result.scalars().all():
+                    orders_by_user[order.user_id].append(order)
 
-                    description = str(row.get(col_description, ""))
-
-                    # Handle HiBob compound amount fields: {"value": 270, "currency": "EUR"}
-                    raw_amount_field = row.get(col_amount)
-                    if isinstance(raw_amount_field, dict):
-                        raw_val = raw_amount_field.get("value")
-                        if raw_val is None:
-                            logger.warning("Skipping entry %s: amount value is null", entry_id)
-                            continue
-                        raw_amount = str(raw_val)
-                        currency = str(raw_amount_field.get("currency") or "EUR")
-                    else:
-                        if raw_amount_field is None:
-                            logger.warning("Skipping entry %s: amount is null", entry_id)
-                            continue
-                        raw_amount = str(raw_amount_field)
-                        currency = str(row.get(col_currency) or "EUR")
-                    amount_cents = _parse_amount_cents(raw_amount)
-                except Exception:
-                    logger.exception("Failed to parse entry %s", entry_id)
+            for user in users:
+                rows = user_rows.get(user.id)
+                if not rows:
                     continue
 
-                # Try auto-match
-                matching_orders = _find_matching_orders(
-                    user_orders, amount_cents, entry_date,
-                    amount_tolerance, date_tolerance,
+                order_index = _index_orders(
+                    orders_by_user.get(user.id, []), amount_tolerance, date_tolerance,
                 )
 
-                review = HiBobPurchaseReview(
-                    user_id=user.id,
-                    hibob_employee_id=user.hibob_id,
-                    hibob_entry_id=entry_id,
-                    entry_date=entry_date,
-                    description=description,
-                    amount_cents=amount_cents,
-                    currency=currency,
-                    sync_log_id=log.id,
-                    raw_data=row,
-                )
+                for row, entry in zip(rows, parsed[user.id]):
+                    entry_id = str(row.get("id", ""))
+                    if not entry_id or entry_id in processed_entry_ids:
+                        continue
+                    processed_entry_ids.add(entry_id)
 
-                if len(matching_orders) == 1:
-                    # Auto-match
-                    review.status = "matched"
-                    review.matched_order_id = matching_orders[0].id
-                    matched_count += 1
-                elif len(matching_orders) == 0:
-                    # No match: create negative budget adjustment
-                    adjustment = BudgetAdjustment(
-                        user_id=user.id,
-                        amount_cents=-amount_cents,
-                        reason=f"HiBob purchase: {description}",
-                        created_by=triggered_by or user.id,
-                        source="hibob",
-                        hibob_entry_id=entry_id,
+                    entries_found += 1
+
+                    if entry is None:
+                        continue
+                    entry_date = entry.entry_date
+                    description = entry.description
+                    amount_cents = entry.amount_cents
+                    currency = entry.currency
+
+                    # Try auto-match
+                    matching_orders = _find_matching_orders(
+                        _candidate_orders(
+                            order_index, amount_cents, entry_date,
+                            amount_tolerance, date_tolerance,
+                        ),
+                        amount_cents, entry_date,
+                        amount_tolerance, date_tolerance,
                     )
-                    db.add(adjustment)
-                    await db.flush()
-                    review.status = "adjusted"
-                    review.adjustment_id = adjustment.id
-                    auto_adjusted_count += 1
-                    affected_user_ids.add(user.id)
-
-                    await write_audit_log(
-                        db,
-                        user_id=triggered_by or user.id,
-                        action="purchase_sync.budget_adjusted",
-                        resource_type="budget_adjustment",
-                        resource_id=adjustment.id,
-                        details={
-                            "user_id": str(user.id),
-                            "user_email": user.email,
+
+                    review_row = {
+                        "user_id": user.id,
+                        "hibob_employee_id": user.hibob_id,
+                        "hibob_entry_id": entry_id,
+                        "entry_date": entry_date,
+                        "description": description,
+                        "amount_cents": amount_cents,
+                        "currency": currency,
+                        "sync_log_id": log.id,
+                        "raw_data": row,
+                        "matched_order_id": None,
+                        "adjustment_id": None,
+                    }
+
+                    if len(matching_orders) == 1:
+                        # Auto-match
+                        review_row["status"] = "matched"
+                        review_row["matched_order_id"] = matching_orders[0].id
+                        matched_count += 1
+                    elif len(matching_orders) == 0:
+                        # No match: create negative budget adjustment. Client-side
+                        # id so the review and audit entry can reference it
+                        # before the bulk insert.
+                        adjustment_id = uuid4()
+                        adjustment_rows.append({
+                            "id": adjustment_id,
+                            "user_id": user.id,
                             "amount_cents": -amount_cents,
-                            "description": description,
+                            "reason": f"HiBob purchase: {description}",
+                            "created_by": triggered_by or user.id,
+                            "source": "hibob",
                             "hibob_entry_id": entry_id,
-                            "entry_date": str(entry_date),
-                            "currency": currency,
-                        },
-                    )
-                else:
-                    # Ambiguous: needs review
-                    review.status = "pending"
-                    pending_count += 1
-
-                db.add(review)
-                await db.flush()
-
-        # Refresh budget cache for all affected users (old + new adjustments)
-        affected_user_ids.update(previously_affected)
-        for uid in affected_user_ids:
-            await refresh_budget_cache(db, uid)
+                        })
+                        review_row["status"] = "adjusted"
+                        review_row["adjustment_id"] = adjustment_id
+                        auto_adjusted_count += 1
+
+                        await write_audit_log(
+                            db,
+                            user_id=triggered_by or user.id,
+                            action="purchase_sync.budget_adjusted",
+                            resource_type="budget_adjustment",
+                            resource_id=adjustment_id,
+                            details={
+                                "user_id": str(user.id),
+                                "user_email": user.email,
+                                "amount_cents": -amount_cents,
+                                "description": description,
+                                "hibob_entry_id": entry_id,
+                                "entry_date": str(entry_date),
+                                "currency": currency,
+                            },
+                        )
+                    else:
+                        # Ambiguous: needs review
+                        review_row["status"] = "pending"
+                        pending_count += 1
+
+                    review_rows.append(review_row)
+
+            # Write the chunk out before streaming the next one, so rows and
+            # pending audit entries never build up across the whole tenant.
+            # Adjustments go first since reviews reference them.
+            if adjustment_rows:
+                await db.execute(insert(BudgetAdjustment), adjustment_rows)
+            if review_rows:
+                await db.execute(insert(HiBobPurchaseReview), review_rows)
+
+            # Refresh budget cache for the chunk's affected users (old + new
+            # adjustments); each user is streamed in exactly one chunk
+            chunk_user_ids = {user.id for user in users}
+            affected = {row["user_id"] for row in adjustment_rows} | (previously_affected & chunk_user_ids)
+            previously_affected -= chunk_user_ids
+            if affected:
+                await refresh_budget_cache_many(db, affected)
+                affected_user_count += len(affected)
+            await db.flush()
+
+        # Users whose old adjustments were wiped but who were not streamed
+        # (since deactivated or unlinked from HiBob)
+        if previously_affected:
+            await refresh_budget_cache_many(db, previously_affected)
+            affected_user_count += len(previously_affected)
 
         log.status = "completed"
         log.entries_found = entries_found
@@ -285,9 +474,7 @@ async def sync_purchases(
             entries_found, matched_count, auto_adjusted_count, pending_count,
         )
 
-        audit_user_id = triggered_by
-        if not audit_user_id and users:
-            audit_user_id = users[0].id
+        audit_user_id = triggered_by or first_user_id
         if audit_user_id:
             await write_audit_log(
                 db,
@@ -296,12 +483,12 @@ async def sync_purchases(
                 resource_type="system",
                 details={
                     "sync_log_id": str(log.id),
-                    "users_processed": len(users),
+                    "users_processed": users_processed,
                     "entries_found": entries_found,
                     "matched": matched_count,
                     "auto_adjusted": auto_adjusted_count,
                     "pending_review": pending_count,
-                    "affected_user_count": len(affected_user_ids),
+                    "affected_user_count": affected_user_count,
                     "trigger": "manual" if triggered_by else "scheduled",
                 },
             )
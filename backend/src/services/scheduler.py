@@ -10,84 +10,239 @@ Schedule:
 """
 
 import asyncio
+import functools
 import logging
 import time
-from datetime import datetime, timezone
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from uuid import UUID
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.audit.service import write_audit_log
 from src.core.config import settings
 from src.core.database import async_session_factory
-from src.services.settings_service import get_setting, get_setting_int, load_settings
+from src.integrations.aftership.client import aftership_client
+from src.integrations.aftership.sync import sync_all_active_orders
+from src.integrations.hibob.client import HiBobClient
+from src.integrations.hibob.sync import sync_employees
+from src.notifications.service import notify_staff_email
+from src.repositories import user_repo
+from src.services.backup_service import run_backup
+from src.services.cart_service import cleanup_stale_items
+from src.services.delivery_reminder import send_delivery_reminders
+from src.services.hibob_service import (
+    _create_sync_log,
+    _employee_sync_lock,
+    _mark_sync_failed,
+    _purchase_sync_lock,
+    is_employee_sync_locked,
+    is_purchase_sync_locked,
+)
+from src.services.purchase_sync import sync_purchases
+from src.services.settings_service import (
+    get_cached_settings,
+    load_settings,
+    on_settings_changed,
+    settings_version,
+)
 
 logger = logging.getLogger(__name__)
 
+# The API key comes from the environment and cannot change at runtime
+_HIBOB_ENABLED: bool = bool(settings.hibob_api_key)
+
 _scheduler_task: asyncio.Task | None = None
 _last_heartbeat: float = 0.0
 
 # ── Dedup keys ───────────────────────────────────────────────────────────────
 
-_last_run: dict[str, str] = {}
+# A run key only matters while its schedule window is open (an hour at
+# most), so anything older than this can be forgotten.
+_LAST_RUN_TTL = 48 * 3600
+
+# task_name -> (run_key, monotonic time marked), oldest first
+_last_run: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+
+@dataclass(frozen=True, slots=True)
+class _Tick:
+    """Calendar fields of one scheduler tick, computed once for all tasks.
 
+    ``day``, ``hour_slot`` and ``week`` double as integer run keys: equal
+    within a day/hour/week and distinct across them.
+    """
+
+    now: datetime
+    hour: int
+    minute: int
+    weekday: int
+    day: int
+    hour_slot: int
+    week: int
+
+    @classmethod
+    def at(cls, now: datetime) -> "_Tick":
+        day = now.toordinal()
+        return cls(
+            now=now,
+            hour=now.hour,
+            minute=now.minute,
+            weekday=now.weekday(),
+            day=day,
+            hour_slot=day * 24 + now.hour,
+            # Ordinal 1 is a Monday, so weeks run Monday to Sunday like %W
+            week=(day - 1) // 7,
+        )
 
-def _should_run(task_name: str, run_key: str) -> bool:
+
+def _should_run(task_name: str, run_key: int) -> bool:
     """Return True if this task+key hasn't run yet, and mark it as run."""
-    if _last_run.get(task_name) == run_key:
+    now = _last_heartbeat  # monotonic time of the current tick
+    while _last_run and next(iter(_last_run.values()))[1] < now - _LAST_RUN_TTL:
+        _last_run.popitem(last=False)
+
+    last = _last_run.get(task_name)
+    if last is not None and last[0] == run_key:
         return False
-    _last_run[task_name] = run_key
+    _last_run[task_name] = (run_key, now)
+    _last_run.move_to_end(task_name)
     return True
 
 
+# ── Audit attribution ────────────────────────────────────────────────────────
+
+# Staff user scheduled runs are attributed to, and when it was looked up.
+# Re-resolved after a while so a deactivated account stops being used.
+_AUDIT_STAFF_TTL = 300
+_audit_staff: tuple[float, UUID] | None = None
+
+
+async def _get_audit_user(db: AsyncSession) -> UUID | None:
+    global _audit_staff
+    now = time.monotonic()
+    if _audit_staff is not None and now - _audit_staff[0] < _AUDIT_STAFF_TTL:
+        return _audit_staff[1]
+    staff_id = await user_repo.get_first_active_staff_id(db)
+    _audit_staff = (now, staff_id) if staff_id is not None else None
+    return staff_id
+
+
+async def _audit_scheduled(
+    db: AsyncSession, action: str, resource_type: str, details: dict,
+) -> None:
+    """Write an audit entry for a scheduled run, attributed to a staff user.
+
+    The staff id is cached for ``_AUDIT_STAFF_TTL`` seconds; the caller's
+    session is used so no extra session is opened for auditing.
+    """
+    staff_id = await _get_audit_user(db)
+    if staff_id is None:
+        return
+
+    await write_audit_log(
+        db,
+        user_id=staff_id,
+        action=action,
+        resource_type=resource_type,
+        details=details,
+    )
+
+
+async def _notify_staff(notifications: list[dict]) -> None:
+    """Send staff emails once the task's transaction has been committed.
+
+    Each notification runs in its own short-lived session so that slow SMTP
+    delivery never keeps the task's transaction open. Failures are logged,
+    not raised.
+    """
+    async def _send(params: dict) -> int:
+        async with async_session_factory() as db:
+            return await notify_staff_email(db, **params)
+
+    results = await asyncio.gather(
+        *(_send(params) for params in notifications), return_exceptions=True,
+    )
+    for params, result in zip(notifications, results):
+        if isinstance(result, BaseException):
+            logger.error(
+                "Failed to send '%s' notification", params["event"], exc_info=result,
+            )
+
+
+def _cfg_int(cfg: Mapping[str, str], key: str, default: int = 0) -> int:
+    raw = cfg.get(key)
+    return int(raw) if raw else default
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_hours(raw: str) -> frozenset[int]:
+    """Hours from a comma-separated setting, parsed once per distinct value."""
+    return frozenset(int(h.strip()) for h in raw.split(",") if h.strip())
+
+
 # ── Task: Backup ─────────────────────────────────────────────────────────────
 
-async def _run_backup(now: datetime) -> None:
-    enabled = get_setting("backup_schedule_enabled") == "true"
+# (settings version, (enabled, frequency, hour, minute, weekday))
+_backup_cron_cache: tuple[int, tuple[bool, str, int, int, int]] | None = None
+
+
+def _backup_cron(cfg: Mapping[str, str]) -> tuple[bool, str, int, int, int]:
+    """Parsed backup schedule, re-read from ``cfg`` only when settings change.
+
+    ``cfg`` must be the current get_cached_settings() snapshot.
+    """
+    global _backup_cron_cache
+    version = settings_version()
+    if _backup_cron_cache is None or _backup_cron_cache[0] != version:
+        _backup_cron_cache = (version, (
+            cfg.get("backup_schedule_enabled") == "true",
+            cfg.get("backup_schedule_frequency") or "daily",
+            int(cfg.get("backup_schedule_hour") or "2"),
+            int(cfg.get("backup_schedule_minute") or "0"),
+            int(cfg.get("backup_schedule_weekday") or "0"),
+        ))
+    return _backup_cron_cache[1]
+
+
+async def _run_backup(tick: _Tick, cfg: Mapping[str, str]) -> None:
+    enabled, frequency, hour, minute, weekday = _backup_cron(cfg)
     if not enabled:
         return
 
-    frequency = get_setting("backup_schedule_frequency") or "daily"
-    hour = int(get_setting("backup_schedule_hour") or "2")
-    minute = int(get_setting("backup_schedule_minute") or "0")
-    weekday = int(get_setting("backup_schedule_weekday") or "0")
-
     if frequency == "hourly":
-        if now.minute != minute:
+        if tick.minute != minute:
             return
-        run_key = now.strftime("%Y-%m-%d-%H")
+        run_key = tick.hour_slot
     elif frequency == "weekly":
-        if now.weekday() != weekday or now.hour != hour or now.minute != minute:
+        if tick.weekday != weekday or tick.hour != hour or tick.minute != minute:
             return
-        run_key = now.strftime("%Y-W%W")
+        run_key = tick.week
     else:  # daily
-        if now.hour != hour or now.minute != minute:
+        if tick.hour != hour or tick.minute != minute:
             return
-        run_key = now.strftime("%Y-%m-%d")
+        run_key = tick.day
 
     if not _should_run("backup", run_key):
         return
 
     logger.info("Scheduled %s backup triggered", frequency)
-    from src.services.backup_service import run_backup
     filename = await run_backup(triggered_by="scheduler")
     logger.info("Scheduled backup completed: %s", filename)
 
     # Audit
     try:
-        from src.audit.service import write_audit_log
-        from src.repositories import user_repo
-
         filepath = Path(settings.backup_dir) / filename
         size = filepath.stat().st_size if filepath.exists() else 0
 
         async with async_session_factory() as db:
-            staff = await user_repo.get_active_staff(db)
-            if staff:
-                await write_audit_log(
-                    db,
-                    user_id=staff[0].id,
-                    action="backup.scheduled.completed",
-                    resource_type="database",
-                    details={"filename": filename, "size_bytes": size, "triggered_by": "scheduler"},
-                )
+            await _audit_scheduled(
+                db, "backup.scheduled.completed", "database",
+                {"filename": filename, "size_bytes": size, "triggered_by": "scheduler"},
+            )
             await db.commit()
     except Exception:
         logger.exception("Failed to write audit log for scheduled backup")
@@ -95,19 +250,18 @@ async def _run_backup(now: datetime) -> None:
 
 # ── Task: Delivery Reminders ─────────────────────────────────────────────────
 
-async def _run_delivery_reminders(now: datetime) -> None:
-    delivery_hour = get_setting_int("delivery_reminder_hour", 8)
-    if now.hour != delivery_hour:
+async def _run_delivery_reminders(tick: _Tick, cfg: Mapping[str, str]) -> None:
+    delivery_hour = _cfg_int(cfg, "delivery_reminder_hour", 8)
+    if tick.hour != delivery_hour:
         return
 
-    run_key = now.strftime("%Y-%m-%d")
+    run_key = tick.day
     if not _should_run("delivery_reminder", run_key):
         return
 
     logger.info("Delivery reminder check triggered")
     async with async_session_factory() as db:
         await load_settings(db)
-        from src.services.delivery_reminder import send_delivery_reminders
         sent = await send_delivery_reminders(db)
         await db.commit()
 
@@ -117,40 +271,26 @@ async def _run_delivery_reminders(now: datetime) -> None:
 
 # ── Task: AfterShip Tracking ────────────────────────────────────────────────
 
-async def _run_aftership_sync(now: datetime) -> None:
-    from src.integrations.aftership.client import aftership_client
+async def _run_aftership_sync(tick: _Tick, cfg: Mapping[str, str]) -> None:
     if not aftership_client.is_configured:
         return
 
-    raw = get_setting("aftership_sync_hours", "8,12,16,20")
-    sync_hours = tuple(int(h.strip()) for h in raw.split(",") if h.strip())
-    if now.hour not in sync_hours:
+    sync_hours = _parse_hours(cfg.get("aftership_sync_hours") or "8,12,16,20")
+    if tick.hour not in sync_hours:
         return
 
-    run_key = f"{now.strftime('%Y-%m-%d')}T{now.hour}"
+    run_key = tick.hour_slot
     if not _should_run("aftership", run_key):
         return
 
     logger.info("AfterShip scheduled sync triggered")
-    from src.integrations.aftership.sync import sync_all_active_orders
-    from src.audit.service import write_audit_log
-    from src.repositories import user_repo
-
     result = await sync_all_active_orders()
     logger.info("AfterShip sync result: %s", result)
 
     # Audit trail for AfterShip sync
     try:
         async with async_session_factory() as db:
-            staff = await user_repo.get_active_staff(db)
-            if staff:
-                await write_audit_log(
-                    db,
-                    user_id=staff[0].id,
-                    action="aftership_sync",
-                    resource_type="aftership",
-                    details={"result": result},
-                )
+            await _audit_scheduled(db, "aftership_sync", "aftership", {"result": result})
             await db.commit()
     except Exception:
         logger.exception("Failed to write audit log for AfterShip sync")
@@ -158,79 +298,62 @@ async def _run_aftership_sync(now: datetime) -> None:
 
 # ── Task: HiBob User Sync (every 24h) ───────────────────────────────────────
 
-async def _run_hibob_user_sync(now: datetime) -> None:
-    if not settings.hibob_api_key:
+async def _run_hibob_user_sync(tick: _Tick, cfg: Mapping[str, str]) -> None:
+    if not _HIBOB_ENABLED:
         return
 
-    sync_hour = get_setting_int("hibob_user_sync_hour")
-    if now.hour != sync_hour:
+    sync_hour = _cfg_int(cfg, "hibob_user_sync_hour")
+    if tick.hour != sync_hour:
         return
 
-    run_key = now.strftime("%Y-%m-%d")
+    run_key = tick.day
     if not _should_run("hibob_users", run_key):
         return
 
     logger.info("Scheduled HiBob user sync triggered")
-    from src.services.hibob_service import _employee_sync_lock, is_employee_sync_locked
-
     if is_employee_sync_locked():
         logger.warning("HiBob user sync skipped — already in progress")
         return
 
     async with _employee_sync_lock:
-        from src.integrations.hibob.client import HiBobClient
-        from src.integrations.hibob.sync import sync_employees
-        from src.audit.service import write_audit_log
-        from src.repositories import user_repo
-        from src.notifications.service import notify_staff_email
-
         async with async_session_factory() as db:
             try:
                 client = HiBobClient()
                 log = await sync_employees(db, client, admin_id=None)
 
-                # Audit — attribute to first admin
-                staff = await user_repo.get_active_staff(db)
-                if staff:
-                    await write_audit_log(
-                        db,
-                        user_id=staff[0].id,
-                        action="hibob.scheduled_sync.completed",
-                        resource_type="hibob_sync",
-                        details={
-                            "status": log.status,
-                            "synced": log.employees_synced,
-                            "created": log.employees_created,
-                            "updated": log.employees_updated,
-                            "deactivated": log.employees_deactivated,
+                await _audit_scheduled(
+                    db, "hibob.scheduled_sync.completed", "hibob_sync",
+                    {
+                        "status": log.status,
+                        "synced": log.employees_synced,
+                        "created": log.employees_created,
+                        "updated": log.employees_updated,
+                        "deactivated": log.employees_deactivated,
+                        "error_message": log.error_message,
+                        "trigger": "scheduled",
+                    },
+                )
+
+                if log.status == "failed":
+                    notification = {
+                        "event": "hibob.sync_error",
+                        "subject": "HiBob Scheduled Sync Failed",
+                        "template_name": "hibob_sync_error.html",
+                        "context": {"error_message": log.error_message},
+                    }
+                else:
+                    notification = {
+                        "event": "hibob.sync",
+                        "subject": "HiBob Scheduled Sync Complete",
+                        "template_name": "hibob_sync_complete.html",
+                        "context": {
+                            "employees_synced": log.employees_synced,
+                            "employees_created": log.employees_created,
+                            "employees_updated": log.employees_updated,
+                            "employees_deactivated": log.employees_deactivated,
                             "error_message": log.error_message,
-                            "trigger": "scheduled",
                         },
-                    )
-
-                try:
-                    if log.status == "failed":
-                        await notify_staff_email(
-                            db, event="hibob.sync_error",
-                            subject="HiBob Scheduled Sync Failed",
-                            template_name="hibob_sync_error.html",
-                            context={"error_message": log.error_message},
-                        )
-                    else:
-                        await notify_staff_email(
-                            db, event="hibob.sync",
-                            subject="HiBob Scheduled Sync Complete",
-                            template_name="hibob_sync_complete.html",
-                            context={
-                                "employees_synced": log.employees_synced,
-                                "employees_created": log.employees_created,
-                                "employees_updated": log.employees_updated,
-                                "employees_deactivated": log.employees_deactivated,
-                                "error_message": log.error_message,
-                            },
-                        )
-                except Exception:
-                    logger.exception("Failed to send HiBob sync notification")
+                    }
 
                 await db.commit()
                 logger.info(
@@ -238,6 +361,7 @@ async def _run_hibob_user_sync(now: datetime) -> None:
                     log.employees_synced, log.employees_created,
                     log.employees_updated, log.employees_deactivated,
                 )
+                await _notify_staff([notification])
             except Exception:
                 await db.rollback()
                 logger.exception("Scheduled HiBob user sync failed")
@@ -245,35 +369,22 @@ async def _run_hibob_user_sync(now: datetime) -> None:
 
 # ── Task: Cart Stale Cleanup ─────────────────────────────────────────────────
 
-async def _run_cart_cleanup(now: datetime) -> None:
-    cleanup_hour = get_setting_int("cart_cleanup_hour", 4)
-    cleanup_minute = get_setting_int("cart_cleanup_minute", 30)
-    if now.hour != cleanup_hour or now.minute != cleanup_minute:
+async def _run_cart_cleanup(tick: _Tick, cfg: Mapping[str, str]) -> None:
+    cleanup_hour = _cfg_int(cfg, "cart_cleanup_hour", 4)
+    cleanup_minute = _cfg_int(cfg, "cart_cleanup_minute", 30)
+    if tick.hour != cleanup_hour or tick.minute != cleanup_minute:
         return
 
-    run_key = now.strftime("%Y-%m-%d")
+    run_key = tick.day
     if not _should_run("cart_cleanup", run_key):
         return
 
     logger.info("Cart stale item cleanup triggered")
-    from src.services.cart_service import cleanup_stale_items
-    from src.audit.service import write_audit_log
-    from src.repositories import user_repo
-
     async with async_session_factory() as db:
         try:
             removed = await cleanup_stale_items(db)
 
-            # Audit trail for cart cleanup
-            staff = await user_repo.get_active_staff(db)
-            if staff:
-                await write_audit_log(
-                    db,
-                    user_id=staff[0].id,
-                    action="cart_cleanup",
-                    resource_type="cart",
-                    details={"removed": removed},
-                )
+            await _audit_scheduled(db, "cart_cleanup", "cart", {"removed": removed})
 
             await db.commit()
             logger.info("Cart stale cleanup completed: %d items removed", removed)
@@ -284,72 +395,55 @@ async def _run_cart_cleanup(now: datetime) -> None:
 
 # ── Task: HiBob Purchase Sync (configurable hours) ──────────────────────────
 
-async def _run_hibob_purchase_sync(now: datetime) -> None:
-    if not settings.hibob_api_key:
+async def _run_hibob_purchase_sync(tick: _Tick, cfg: Mapping[str, str]) -> None:
+    if not _HIBOB_ENABLED:
         return
 
-    raw = get_setting("hibob_purchase_sync_hours")
-    purchase_sync_hours = tuple(int(h.strip()) for h in raw.split(",") if h.strip())
-    if now.hour not in purchase_sync_hours:
+    purchase_sync_hours = _parse_hours(cfg.get("hibob_purchase_sync_hours", ""))
+    if tick.hour not in purchase_sync_hours:
         return
 
-    run_key = f"{now.strftime('%Y-%m-%d')}T{now.hour}"
-    if not _should_run("hibob_purchases", run_key):
+    table_id = cfg.get("hibob_purchase_table_id", "")
+    if not table_id:
         return
 
-    table_id = get_setting("hibob_purchase_table_id")
-    if not table_id:
+    run_key = tick.hour_slot
+    if not _should_run("hibob_purchases", run_key):
         return
 
     logger.info("Scheduled HiBob purchase sync triggered")
-    from src.services.hibob_service import _purchase_sync_lock, is_purchase_sync_locked, _create_sync_log, _mark_sync_failed
-
     if is_purchase_sync_locked():
         logger.warning("HiBob purchase sync skipped — already in progress")
         return
 
     async with _purchase_sync_lock:
-        from src.integrations.hibob.client import HiBobClient
-        from src.services.purchase_sync import sync_purchases
-        from src.audit.service import write_audit_log
-        from src.repositories import user_repo
-        from src.notifications.service import notify_staff_email
-
         log_id = await _create_sync_log(None)
         async with async_session_factory() as db:
             try:
                 client = HiBobClient()
                 purchase_log = await sync_purchases(db, client, triggered_by=None, log_id=log_id)
 
-                # Audit
-                staff = await user_repo.get_active_staff(db)
-                if staff:
-                    await write_audit_log(
-                        db,
-                        user_id=staff[0].id,
-                        action="hibob.scheduled_purchase_sync.completed",
-                        resource_type="hibob_purchase_sync",
-                        details={
-                            "status": purchase_log.status,
-                            "entries_found": purchase_log.entries_found,
-                            "matched": purchase_log.matched,
-                            "auto_adjusted": purchase_log.auto_adjusted,
-                            "pending_review": purchase_log.pending_review,
-                            "error_message": getattr(purchase_log, "error_message", None),
-                            "trigger": "scheduled",
-                        },
-                    )
+                await _audit_scheduled(
+                    db, "hibob.scheduled_purchase_sync.completed", "hibob_purchase_sync",
+                    {
+                        "status": purchase_log.status,
+                        "entries_found": purchase_log.entries_found,
+                        "matched": purchase_log.matched,
+                        "auto_adjusted": purchase_log.auto_adjusted,
+                        "pending_review": purchase_log.pending_review,
+                        "error_message": getattr(purchase_log, "error_message", None),
+                        "trigger": "scheduled",
+                    },
+                )
 
+                notifications = []
                 if purchase_log.pending_review > 0:
-                    try:
-                        await notify_staff_email(
-                            db, event="hibob.purchase_review",
-                            subject="HiBob Purchases Pending Review",
-                            template_name="purchase_review_pending.html",
-                            context={"count": purchase_log.pending_review},
-                        )
-                    except Exception:
-                        logger.exception("Failed to send purchase review notification")
+                    notifications.append({
+                        "event": "hibob.purchase_review",
+                        "subject": "HiBob Purchases Pending Review",
+                        "template_name": "purchase_review_pending.html",
+                        "context": {"count": purchase_log.pending_review},
+                    })
 
                 await db.commit()
                 logger.info(
@@ -357,6 +451,7 @@ async def _run_hibob_purchase_sync(now: datetime) -> None:
                     purchase_log.entries_found, purchase_log.matched,
                     purchase_log.auto_adjusted, purchase_log.pending_review,
                 )
+                await _notify_staff(notifications)
             except Exception:
                 await db.rollback()
                 await _mark_sync_failed(log_id)
@@ -365,34 +460,207 @@ async def _run_hibob_purchase_sync(now: datetime) -> None:
 
 # ── Main Loop ────────────────────────────────────────────────────────────────
 
-ALL_TASKS = [
-    ("backup", _run_backup),
-    ("delivery_reminder", _run_delivery_reminders),
-    ("aftership", _run_aftership_sync),
-    ("hibob_users", _run_hibob_user_sync),
-    ("cart_cleanup", _run_cart_cleanup),
-    ("hibob_purchases", _run_hibob_purchase_sync),
+# Groups run concurrently on each tick; tasks within a group run in order.
+# The HiBob syncs share one so purchases see freshly synced users and the
+# two never compete for the HiBob rate limit.
+TASK_GROUPS = [
+    [("backup", _run_backup)],
+    [("delivery_reminder", _run_delivery_reminders)],
+    [("aftership", _run_aftership_sync)],
+    [("hibob_users", _run_hibob_user_sync), ("hibob_purchases", _run_hibob_purchase_sync)],
+    [("cart_cleanup", _run_cart_cleanup)],
 ]
 
+ALL_TASKS = [task for group in TASK_GROUPS for task in group]
+
+
+# ── Wakeup planning ──────────────────────────────────────────────────────────
+
+# Upper bound on a single sleep, so settings changed by another worker are
+# still picked up reasonably soon.
+_MAX_SLEEP = 15 * 60
+
+_reschedule = asyncio.Event()
+_next_tick_at: float = 0.0  # monotonic time the loop plans to wake next
+
+
+@dataclass(frozen=True, slots=True)
+class _CronSpec:
+    """Wall-clock instants a task can become due: ``minute`` past each hour
+    in ``hours`` (every hour if None), on ``weekday`` (every day if None)."""
+
+    minute: int = 0
+    hours: frozenset[int] | None = None
+    weekday: int | None = None
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.minute < 60:
+            raise ValueError(f"minute out of range: {self.minute}")
+        if self.hours and not all(0 <= h < 24 for h in self.hours):
+            raise ValueError(f"hour out of range: {sorted(self.hours)}")
+        if self.weekday is not None and not 0 <= self.weekday < 7:
+            raise ValueError(f"weekday out of range: {self.weekday}")
+
+
+def _backup_spec(cfg: Mapping[str, str]) -> _CronSpec | None:
+    enabled, frequency, hour, minute, weekday = _backup_cron(cfg)
+    if not enabled:
+        return None
+    if frequency == "hourly":
+        return _CronSpec(minute=minute)
+    return _CronSpec(
+        minute=minute,
+        hours=frozenset({hour}),
+        weekday=weekday if frequency == "weekly" else None,
+    )
+
+
+def _cron_specs(cfg: Mapping[str, str]) -> list[_CronSpec]:
+    """Mirror the due checks of the tasks above as fire specs.
+
+    Hour-window tasks are due for their whole hour, so waking at the top of
+    it is enough. HiBob tasks are left out when no API key is configured;
+    tasks disabled by settings just find nothing to do. Schedule settings
+    are admin-editable free text: a spec that fails to parse is logged and
+    left out so the other tasks keep being planned.
+    """
+    builders: list[tuple[str, Callable[[], _CronSpec | None]]] = [
+        ("delivery_reminders", lambda: _CronSpec(
+            hours=frozenset({_cfg_int(cfg, "delivery_reminder_hour", 8)}),
+        )),
+        ("aftership_sync", lambda: _CronSpec(
+            hours=_parse_hours(cfg.get("aftership_sync_hours") or "8,12,16,20"),
+        )),
+        ("cart_cleanup", lambda: _CronSpec(
+            minute=_cfg_int(cfg, "cart_cleanup_minute", 30),
+            hours=frozenset({_cfg_int(cfg, "cart_cleanup_hour", 4)}),
+        )),
+        ("backup", lambda: _backup_spec(cfg)),
+    ]
+    if _HIBOB_ENABLED:
+        builders.append(("hibob_user_sync", lambda: _CronSpec(
+            hours=frozenset({_cfg_int(cfg, "hibob_user_sync_hour")}),
+        )))
+        builders.append(("hibob_purchase_sync", lambda: _CronSpec(
+            hours=_parse_hours(cfg.get("hibob_purchase_sync_hours", "")),
+        )))
+
+    specs = []
+    for task_name, build in builders:
+        try:
+            spec = build()
+        except ValueError as exc:
+            logger.warning("Ignoring malformed schedule for '%s': %s", task_name, exc)
+            continue
+        if spec is not None:
+            specs.append(spec)
+    return specs
+
+
+def _next_fire(spec: _CronSpec, now: datetime) -> datetime | None:
+    """First instant strictly after ``now`` matching ``spec``."""
+    if spec.hours is not None and not spec.hours:
+        return None
+    hours = sorted(spec.hours) if spec.hours is not None else range(24)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for day in range(8):
+        start = midnight + timedelta(days=day)
+        if spec.weekday is not None and start.weekday() != spec.weekday:
+            continue
+        for hour in hours:
+            fire = start.replace(hour=hour, minute=spec.minute)
+            if fire > now:
+                return fire
+    return None
+
+
+def _seconds_until_next_fire(now: datetime, cfg: Mapping[str, str]) -> float:
+    fires = [f for f in (_next_fire(spec, now) for spec in _cron_specs(cfg)) if f is not None]
+    if not fires:
+        return _MAX_SLEEP
+    return min((min(fires) - now).total_seconds(), _MAX_SLEEP)
+
+
+# Settings read by _cron_specs; changing any of them moves the next wakeup
+_SCHEDULE_KEYS = frozenset({
+    "delivery_reminder_hour",
+    "aftership_sync_hours",
+    "cart_cleanup_hour",
+    "cart_cleanup_minute",
+    "hibob_user_sync_hour",
+    "hibob_purchase_sync_hours",
+    "backup_schedule_enabled",
+    "backup_schedule_frequency",
+    "backup_schedule_hour",
+    "backup_schedule_minute",
+    "backup_schedule_weekday",
+})
+
+
+def reschedule() -> None:
+    """Wake the scheduler so it re-plans against the current settings."""
+    _reschedule.set()
+
+
+def _on_settings_changed(keys: frozenset[str]) -> None:
+    if keys & _SCHEDULE_KEYS:
+        reschedule()
+
+
+async def _run_task_group(group: list, tick: _Tick, cfg: Mapping[str, str]) -> None:
+    for task_name, task_fn in group:
+        try:
+            await task_fn(tick, cfg)
+        except Exception:
+            logger.exception("Scheduler task '%s' failed", task_name)
+
 
 async def _scheduler_loop() -> None:
-    """Single event loop — checks every 60s which tasks are due."""
-    global _last_heartbeat
+    """Single event loop — sleeps until the next instant a task can be due.
+
+    The next wakeup is computed from the schedules in settings, so the loop
+    wakes a handful of times a day instead of every minute. Updates to
+    schedule settings in this process re-plan immediately; changes made by
+    another worker apply within ``_MAX_SLEEP``.
+    """
+    global _last_heartbeat, _next_tick_at
+    delay = 60 - time.time() % 60
     while True:
-        await asyncio.sleep(60)
+        _next_tick_at = time.monotonic() + delay
+        wake_at = time.time() + delay
+        try:
+            await asyncio.wait_for(_reschedule.wait(), timeout=delay)
+        except TimeoutError:
+            pass
+        else:
+            wake_at = time.time()
+        _reschedule.clear()
+
+        # Clocks are read once per tick; tasks get the ``_Tick`` passed down.
+        # A timer firing a hair early must not land in the previous minute.
         _last_heartbeat = time.monotonic()
-        now = datetime.now(timezone.utc)
+        now = datetime.fromtimestamp(max(time.time(), wake_at), tz=timezone.utc)
+        # One settings snapshot per tick, shared by every task's due check
+        cfg = get_cached_settings()
 
-        for task_name, task_fn in ALL_TASKS:
-            try:
-                await task_fn(now)
-            except Exception:
-                logger.exception("Scheduler task '%s' failed", task_name)
+        # A slow sync no longer holds up unrelated tasks due on the same tick
+        tick = _Tick.at(now)
+        await asyncio.gather(*(_run_task_group(group, tick, cfg) for group in TASK_GROUPS))
+
+        # Plan from the tick's start: if the tasks overran the next fire
+        # time, tick again straight away rather than skip that window.
+        elapsed = time.time() - now.timestamp()
+        try:
+            delay = max(0.0, _seconds_until_next_fire(now, get_cached_settings()) - elapsed)
+        except Exception:
+            logger.exception("Scheduler failed to plan its next wakeup")
+            delay = _MAX_SLEEP
 
 
 def start_scheduler() -> None:
     global _scheduler_task
     if _scheduler_task is None or _scheduler_task.done():
+        on_settings_changed(_on_settings_changed)
         _scheduler_task = asyncio.create_task(_scheduler_loop())
         logger.info(
             "Unified scheduler started — backup, delivery reminders, "
@@ -404,8 +672,9 @@ def start_scheduler() -> None:
 def get_scheduler_health() -> dict:
     """Return scheduler health based on heartbeat recency.
 
-    The scheduler loop runs every 60 seconds. A heartbeat older than
-    70 seconds (with 10s grace) indicates the scheduler may be stalled.
+    The loop sleeps until its planned next tick, so it is only overdue once
+    that has passed by more than 10s. While a tick's tasks are running, a
+    heartbeat older than 70 seconds indicates the scheduler may be stalled.
     """
     if _scheduler_task is None:
         return {"status": "not_started"}
@@ -414,8 +683,9 @@ def get_scheduler_health() -> dict:
     if _last_heartbeat == 0.0:
         # Task was created but hasn't completed its first loop yet
         return {"status": "starting"}
-    elapsed = time.monotonic() - _last_heartbeat
-    if elapsed > 70:
+    now = time.monotonic()
+    elapsed = now - _last_heartbeat
+    if now > max(_next_tick_at, _last_heartbeat + 60) + 10:
         return {"status": "stale", "last_heartbeat_secs_ago": round(elapsed)}
     return {"status": "healthy", "last_heartbeat_secs_ago": round(elapsed)}
 
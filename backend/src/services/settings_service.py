@@ -1,11 +1,15 @@
 import asyncio
 import logging
 import time
+from collections.abc import Callable, Mapping
+from types import MappingProxyType
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.database import async_session_factory
 from src.models.orm.app_setting import AppSetting
 
 logger = logging.getLogger(__name__)
@@ -48,63 +52,164 @@ DEFAULT_SETTINGS = {
     "max_csv_export_rows": "10000",
 }
 
+_DEFAULTS_VIEW: Mapping[str, str] = MappingProxyType(DEFAULT_SETTINGS)
+
 _cache: dict[str, str] = {}
 _cache_lock = asyncio.Lock()
 _cache_loaded_at: float = 0
+# Bumped whenever the cached settings change, so callers can memoize values
+# derived from them
+_settings_version: int = 0
+# Parsed values for get_setting_int (None for empty settings); cleared
+# together with every cache change
+_int_cache: dict[str, int | None] = {}
 
 
 async def load_settings(db: AsyncSession) -> dict[str, str]:
-    global _cache, _cache_loaded_at
+    global _cache, _cache_loaded_at, _settings_version
     result = await db.execute(select(AppSetting))
     settings = {s.key: s.value for s in result.scalars().all()}
     async with _cache_lock:
         _cache = {**DEFAULT_SETTINGS, **settings}
         _cache_loaded_at = time.monotonic()
+        _settings_version += 1
+        _int_cache.clear()
     return _cache
 
 
+async def load_settings_if_stale(db: AsyncSession, ttl: float = 30) -> dict[str, str]:
+    """Reload settings unless this process loaded them within ``ttl`` seconds."""
+    if _cache and (time.monotonic() - _cache_loaded_at) < ttl:
+        return _cache
+    return await load_settings(db)
+
+
 def _is_cache_fresh() -> bool:
     return bool(_cache) and (time.monotonic() - _cache_loaded_at) < _CACHE_TTL
 
 
-def get_cached_settings() -> dict[str, str]:
-    if not _cache or not _is_cache_fresh():
-        return dict(DEFAULT_SETTINGS)
-    return dict(_cache)
+_refresh_task: asyncio.Task | None = None
 
+# Called with the changed keys after each update_settings() in this process
+_change_listeners: list[Callable[[frozenset[str]], None]] = []
 
-def get_setting(key: str, default: str | None = None) -> str:
-    fallback = default if default is not None else DEFAULT_SETTINGS.get(key, "")
+
+def on_settings_changed(callback: Callable[[frozenset[str]], None]) -> None:
+    """Register ``callback(changed_keys)`` to run after every settings update."""
+    if callback not in _change_listeners:
+        _change_listeners.append(callback)
+
+
+async def _refresh_settings() -> None:
+    try:
+        async with async_session_factory() as db:
+            await load_settings(db)
+    except Exception:
+        logger.exception("Background settings refresh failed")
+
+
+def _refresh_in_background() -> None:
+    """Start one reload of a stale cache without blocking the caller."""
+    global _refresh_task
+    if _refresh_task is not None and not _refresh_task.done():
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    _refresh_task = loop.create_task(_refresh_settings())
+
+
+def _effective_settings() -> dict[str, str]:
+    """The cache, or the defaults if nothing was loaded yet.
+
+    A stale cache is still served, since it is closer to the admin's
+    configuration than the defaults, while a reload runs in the background.
+    """
+    if not _cache:
+        return DEFAULT_SETTINGS
     if not _is_cache_fresh():
-        return DEFAULT_SETTINGS.get(key, fallback)
-    return _cache.get(key, DEFAULT_SETTINGS.get(key, fallback))
+        _refresh_in_background()
+    return _cache
+
+
+def settings_version() -> int:
+    """Version of what get_cached_settings() currently returns.
+
+    Changes on every reload or update; -1 while only the defaults are
+    available.
+    """
+    return _settings_version if _cache else -1
+
+
+def get_cached_settings() -> Mapping[str, str]:
+    """Read-only view of the effective settings; no copy is made.
+
+    The cache is replaced rather than mutated on updates, so a returned view
+    is a snapshot that does not change afterwards.
+    """
+    effective = _effective_settings()
+    if effective is DEFAULT_SETTINGS:
+        return _DEFAULTS_VIEW
+    return MappingProxyType(effective)
+
+
+def get_setting(key: str, default: str | None = None) -> str:
+    value = _effective_settings().get(key)
+    if value is None:
+        value = DEFAULT_SETTINGS.get(key, default if default is not None else "")
+    return value
 
 
 def get_setting_int(key: str, default: int = 0) -> int:
-    raw = get_setting(key)
-    return int(raw) if raw else default
+    try:
+        value = _int_cache[key]
+    except KeyError:
+        raw = get_setting(key)
+        value = _int_cache[key] = int(raw) if raw else None
+    return default if value is None else value
 
 
 async def update_setting(
     db: AsyncSession, key: str, value: str, updated_by: UUID | None = None
 ) -> None:
-    global _cache_loaded_at
-    result = await db.execute(
-        select(AppSetting).where(AppSetting.key == key)
+    await update_settings(db, {key: value}, updated_by)
+
+
+async def update_settings(
+    db: AsyncSession, values: dict[str, str], updated_by: UUID | None = None
+) -> None:
+    """Upsert several settings in a single INSERT ... ON CONFLICT statement."""
+    global _cache, _cache_loaded_at, _settings_version
+    if not values:
+        return
+    stmt = pg_insert(AppSetting).values([
+        {"key": key, "value": value, "updated_by": updated_by}
+        for key, value in values.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AppSetting.key],
+        set_={
+            "value": stmt.excluded.value,
+            "updated_by": stmt.excluded.updated_by,
+            "updated_at": func.now(),
+        },
     )
-    setting = result.scalar_one_or_none()
-    if setting:
-        setting.value = value
-        setting.updated_by = updated_by
-    else:
-        setting = AppSetting(key=key, value=value, updated_by=updated_by)
-        db.add(setting)
-    await db.flush()
+    await db.execute(stmt)
 
     async with _cache_lock:
-        _cache[key] = value
+        # Copy-on-write: views handed out by get_cached_settings() stay a
+        # stable snapshot of the settings they were taken from
+        _cache = {**(_cache or DEFAULT_SETTINGS), **values}
         _cache_loaded_at = time.monotonic()
-    logger.info("Setting '%s' updated", key)
+        _settings_version += 1
+        _int_cache.clear()
+    for key in values:
+        logger.info("Setting '%s' updated", key)
+
+    changed = frozenset(values)
+    for callback in _change_listeners:
+        callback(changed)
 
 
 async def get_all_settings(db: AsyncSession) -> dict[str, str]:
@@ -114,12 +219,15 @@ async def get_all_settings(db: AsyncSession) -> dict[str, str]:
 
 
 async def seed_defaults(db: AsyncSession) -> None:
-    for key, value in DEFAULT_SETTINGS.items():
-        result = await db.execute(
-            select(AppSetting).where(AppSetting.key == key)
-        )
-        if not result.scalar_one_or_none():
-            db.add(AppSetting(key=key, value=value))
+    result = await db.execute(
+        select(AppSetting.key).where(AppSetting.key.in_(DEFAULT_SETTINGS))
+    )
+    existing = set(result.scalars().all())
+    db.add_all([
+        AppSetting(key=key, value=value)
+        for key, value in DEFAULT_SETTINGS.items()
+        if key not in existing
+    ])
     await db.flush()
 
 
@@ -1,13 +1,16 @@
+import asyncio
 import logging
+import time
 from datetime import date
-from urllib.parse import urlparse
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Row, Select, bindparam, delete, literal, null, select, union_all, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.database import side_session
 from src.core.exceptions import BadRequestError, NotFoundError
 from src.models.orm.budget_adjustment import BudgetAdjustment
+from src.models.orm.budget_rule import BudgetRule
 from src.models.orm.hibob_purchase_review import HiBobPurchaseReview
 from src.models.orm.user import User
 from src.models.orm.user_budget_override import UserBudgetOverride
@@ -17,21 +20,140 @@ from src.services.auth_service import logout as revoke_user_sessions
 
 logger = logging.getLogger(__name__)
 
-_ALLOWED_AVATAR_HOSTS = {
-    "images.hibob.com",
-    "lh3.googleusercontent.com",
-    "www.gravatar.com",
-}
+# https:// plus an allowed host and the path separator, so neither other
+# schemes nor look-alike hosts ("images.hibob.com.evil.io") can match
+_ALLOWED_AVATAR_PREFIXES = tuple(
+    f"https://{host}/"
+    for host in (
+        "images.hibob.com",
+        "lh3.googleusercontent.com",
+        "www.gravatar.com",
+    )
+)
+
+
+# Departments only change through the HiBob employee sync, which
+# invalidates this cache
+_departments_cache: list[str] | None = None
+_departments_cached_at: float = 0
+_DEPARTMENTS_CACHE_TTL = 60
+
+
+def invalidate_departments_cache() -> None:
+    global _departments_cache, _departments_cached_at
+    _departments_cache = None
+    _departments_cached_at = 0
 
 
 async def get_departments(db: AsyncSession) -> list[str]:
-    result = await db.execute(
+    global _departments_cache, _departments_cached_at
+    now = time.monotonic()
+    if _departments_cache is not None and (now - _departments_cached_at) < _DEPARTMENTS_CACHE_TTL:
+        return _departments_cache
+    result = await db.scalars(
         select(User.department)
         .where(User.department.isnot(None), User.is_active.is_(True))
-        .group_by(User.department)
+        .distinct()
         .order_by(User.department)
     )
-    return [row[0] for row in result.all()]
+    _departments_cache = list(result.all())
+    _departments_cached_at = now
+    return _departments_cache
+
+
+# Most recent orders, adjustments and purchase reviews shown on the user
+# detail view
+_DETAIL_ORDERS_LIMIT = 100
+_DETAIL_HISTORY_LIMIT = 100
+
+
+async def _load_orders(user_id: UUID) -> list[dict]:
+    async with side_session() as session:
+        return await order_service.get_recent_orders(
+            session, user_id, limit=_DETAIL_ORDERS_LIMIT,
+        )
+
+
+async def _load_live_budget(user_id: UUID) -> tuple[int, int]:
+    async with side_session() as session:
+        return await budget_service.get_live_totals_cents(session, user_id)
+
+
+async def _load_budget_rules(user_id: UUID) -> tuple[list[BudgetRule], list[UserBudgetOverride]]:
+    async with side_session() as session:
+        rules = await budget_service.get_budget_rules(session)
+        overrides = await budget_service.get_user_overrides(session, user_id)
+    return rules, overrides
+
+
+def _build_user_history_stmt() -> Select:
+    """Manual adjustments and HiBob purchase reviews of ``:user_id``.
+
+    A single UNION ALL whose rows carry the columns of both response models,
+    NULL where they belong to the other kind; ``kind`` tells them apart.
+    Each kind is capped at its ``_DETAIL_HISTORY_LIMIT`` most recent rows.
+    """
+    user_id = bindparam("user_id")
+    adj_q = select(
+        literal("adj").label("kind"),
+        BudgetAdjustment.id,
+        BudgetAdjustment.amount_cents,
+        BudgetAdjustment.user_id,
+        BudgetAdjustment.reason,
+        BudgetAdjustment.created_by,
+        BudgetAdjustment.created_at,
+        null().label("entry_date"),
+        null().label("description"),
+        null().label("currency"),
+        null().label("status"),
+        null().label("matched_order_id"),
+    ).where(
+        BudgetAdjustment.user_id == user_id,
+        BudgetAdjustment.source != "hibob",
+    ).order_by(BudgetAdjustment.created_at.desc()).limit(_DETAIL_HISTORY_LIMIT)
+    pr_q = select(
+        literal("pr"),
+        HiBobPurchaseReview.id,
+        HiBobPurchaseReview.amount_cents,
+        null(),
+        null(),
+        null(),
+        null(),
+        HiBobPurchaseReview.entry_date,
+        HiBobPurchaseReview.description,
+        HiBobPurchaseReview.currency,
+        HiBobPurchaseReview.status,
+        HiBobPurchaseReview.matched_order_id,
+    ).where(
+        HiBobPurchaseReview.user_id == user_id,
+    ).order_by(HiBobPurchaseReview.entry_date.desc()).limit(_DETAIL_HISTORY_LIMIT)
+    history = union_all(adj_q, pr_q).subquery()
+    return select(history).order_by(
+        history.c.kind,
+        history.c.created_at.desc(),
+        history.c.entry_date.desc(),
+    )
+
+
+# Built once; only the user id changes between calls
+_USER_HISTORY_STMT = _build_user_history_stmt()
+
+
+async def _load_user_history(
+    db: AsyncSession, user_id: UUID,
+) -> tuple[list[Row], list[Row]]:
+    """Manual adjustments and HiBob purchase reviews in one round trip.
+
+    The rows are returned as-is; the response models read them from
+    attributes.
+    """
+    result = await db.execute(_USER_HISTORY_STMT, {"user_id": user_id})
+
+    adjustments: list[Row] = []
+    purchase_reviews: list[Row] = []
+    for row in result.all():
+        (adjustments if row.kind == "adj" else purchase_reviews).append(row)
+    return adjustments, purchase_reviews
 
 
 async def get_user_detail(db: AsyncSession, user_id: UUID) -> dict:
@@ -39,71 +161,23 @@ async def get_user_detail(db: AsyncSession, user_id: UUID) -> dict:
     if not target:
         raise NotFoundError("User not found")
 
-    orders, _ = await order_service.get_orders(db, user_id=user_id, page=1, per_page=100)
-
-    result = await db.execute(
-        select(BudgetAdjustment)
-        .where(
-            BudgetAdjustment.user_id == user_id,
-            BudgetAdjustment.source != "hibob",
+    # An AsyncSession cannot run queries concurrently, so the independent
+    # reads below use capped side sessions alongside ``db``. Under READ
+    # COMMITTED each statement takes its own snapshot either way.
+    orders, (spent, adjustment_total), (rules, overrides), (adjustments, purchase_reviews) = (
+        await asyncio.gather(
+            _load_orders(user_id),
+            _load_live_budget(user_id),
+            _load_budget_rules(user_id),
+            _load_user_history(db, user_id),
         )
-        .order_by(BudgetAdjustment.created_at.desc())
     )
-    adjustments = [
-        {
-            "id": a.id,
-            "user_id": a.user_id,
-            "amount_cents": a.amount_cents,
-            "reason": a.reason,
-            "created_by": a.created_by,
-            "created_at": a.created_at,
-        }
-        for a in result.scalars().all()
-    ]
-
-    spent = await budget_service.get_live_spent_cents(db, user_id)
-    adjustment_total = await budget_service.get_live_adjustment_cents(db, user_id)
     available = max(0, target.total_budget_cents + adjustment_total - spent)
 
-    rules = await budget_service.get_budget_rules(db)
-    overrides = await budget_service.get_user_overrides(db, user_id)
     timeline = []
     if target.start_date:
         timeline = budget_service.get_budget_timeline(target.start_date, rules, overrides)
 
-    override_dicts = [
-        {
-            "id": o.id,
-            "user_id": o.user_id,
-            "effective_from": o.effective_from,
-            "effective_until": o.effective_until,
-            "initial_cents": o.initial_cents,
-            "yearly_increment_cents": o.yearly_increment_cents,
-            "reason": o.reason,
-            "created_by": o.created_by,
-            "created_at": o.created_at,
-        }
-        for o in overrides
-    ]
-
-    pr_result = await db.execute(
-        select(HiBobPurchaseReview)
-        .where(HiBobPurchaseReview.user_id == user_id)
-        .order_by(HiBobPurchaseReview.entry_date.desc())
-    )
-    purchase_reviews = [
-        {
-            "id": pr.id,
-            "entry_date": pr.entry_date,
-            "description": pr.description,
-            "amount_cents": pr.amount_cents,
-            "currency": pr.currency,
-            "status": pr.status,
-            "matched_order_id": pr.matched_order_id,
-        }
-        for pr in pr_result.scalars().all()
-    ]
-
     return {
         "user": target,
         "orders": orders,
@@ -115,7 +189,7 @@ async def get_user_detail(db: AsyncSession, user_id: UUID) -> dict:
             "available_cents": available,
         },
         "budget_timeline": timeline,
-        "budget_overrides": override_dicts,
+        "budget_overrides": overrides,
         "purchase_reviews": purchase_reviews,
     }
 
@@ -126,7 +200,7 @@ async def change_role(
     if user_id == admin_id:
         raise BadRequestError("Cannot change your own role")
 
-    target = await user_repo.get_by_id(db, user_id)
+    target = await user_repo.get_by_id(db, user_id, only=(User.role, User.email))
     if not target:
         raise NotFoundError("User not found")
 
@@ -140,7 +214,7 @@ async def change_role(
 async def set_probation_override(
     db: AsyncSession, user_id: UUID, override: bool,
 ) -> User:
-    target = await user_repo.get_by_id(db, user_id)
+    target = await user_repo.get_by_id(db, user_id, only=(User.probation_override,))
     if not target:
         raise NotFoundError("User not found")
 
@@ -160,8 +234,7 @@ async def create_budget_override(
     reason: str,
     created_by: UUID,
 ) -> UserBudgetOverride:
-    target = await user_repo.get_by_id(db, user_id)
-    if not target:
+    if await user_repo.get_columns(db, user_id, User.id) is None:
         raise NotFoundError("User not found")
 
     override = UserBudgetOverride(
@@ -181,25 +254,39 @@ async def create_budget_override(
 async def update_budget_override(
     db: AsyncSession, user_id: UUID, override_id: UUID, data: dict,
 ) -> UserBudgetOverride:
-    override = await db.get(UserBudgetOverride, override_id)
-    if not override or override.user_id != user_id:
+    owned = (
+        UserBudgetOverride.id == override_id,
+        UserBudgetOverride.user_id == user_id,
+    )
+    values = {
+        field: data[field]
+        for field in ("effective_from", "effective_until", "initial_cents", "yearly_increment_cents", "reason")
+        if field in data
+    }
+    if values:
+        stmt = update(UserBudgetOverride).where(*owned).values(**values).returning(UserBudgetOverride)
+    else:
+        stmt = select(UserBudgetOverride).where(*owned)
+    result = await db.execute(stmt)
+    override = result.scalar_one_or_none()
+    if not override:
         raise NotFoundError("Budget override not found")
-
-    for field in ("effective_from", "effective_until", "initial_cents", "yearly_increment_cents", "reason"):
-        if field in data:
-            setattr(override, field, data[field])
-    await db.flush()
     return override
 
 
 async def delete_budget_override(
     db: AsyncSession, user_id: UUID, override_id: UUID,
 ) -> None:
-    override = await db.get(UserBudgetOverride, override_id)
-    if not override or override.user_id != user_id:
+    result = await db.execute(
+        delete(UserBudgetOverride)
+        .where(
+            UserBudgetOverride.id == override_id,
+            UserBudgetOverride.user_id == user_id,
+        )
+        .returning(UserBudgetOverride.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise NotFoundError("Budget override not found")
-    await db.delete(override)
-    await db.flush()
 
 
 # ── Functions extracted from routes ──────────────────────────────────────────
@@ -238,12 +325,12 @@ async def get_avatar_url(db: AsyncSession, user_id: UUID) -> str:
     Raises NotFoundError if the user or avatar is missing.
     Raises BadRequestError if the URL is not from an allowed host.
     """
-    target_user = await user_repo.get_by_id(db, user_id)
-    if not target_user or not target_user.avatar_url:
+    row = await user_repo.get_columns(db, user_id, User.avatar_url)
+    avatar_url = row.avatar_url if row else None
+    if not avatar_url:
         raise NotFoundError("Avatar not found")
 
-    parsed = urlparse(target_user.avatar_url)
-    if parsed.scheme not in ("https",) or parsed.hostname not in _ALLOWED_AVATAR_HOSTS:
+    if not avatar_url.startswith(_ALLOWED_AVATAR_PREFIXES):
         raise BadRequestError("Invalid avatar URL")
 
-    return target_user.avatar_url
+    return avatar_url
@@ -74,6 +74,9 @@ def make_product(
         external_url="https://example.com/product",
         is_active=is_active,
         max_quantity_per_user=max_quantity_per_user,
+        stock_warning_level=5,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        updated_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
     )
 
 
@@ -119,11 +122,17 @@ class FakeAmazonClient:
 
     def __init__(self, products: dict[str, AmazonProduct] | None = None):
         self._products = products or {}
+        # Lower-cased names, computed once for all searches
+        self._search_index = [
+            (asin, product, product.name.lower())
+            for asin, product in self._products.items()
+        ]
 
     async def search(self, query: str) -> list[AmazonSearchResult]:
+        query_lower = query.lower()
         results = []
-        for asin, product in self._products.items():
-            if query.lower() in product.name.lower() or query == asin:
+        for asin, product, name_lower in self._search_index:
+            if query_lower in name_lower or query == asin:
                 results.append(AmazonSearchResult(
                     name=product.name,
                     asin=asin,
@@ -142,13 +151,13 @@ class FakeAmazonClient:
             return product.price_cents
         return None
 
-    async def get_variant_prices(self, asins: list[str]) -> dict[str, int]:
-        prices: dict[str, int] = {}
-        for asin in asins:
-            product = self._products.get(asin)
-            if product and product.price_cents > 0:
-                prices[asin] = product.price_cents
-        return prices
+    async def get_variant_prices(self, asins: list[str], max_concurrent: int = 10) -> dict[str, int]:
+        # Same batch limit as AmazonClient.get_variant_prices
+        return {
+            asin: product.price_cents
+            for asin in asins[:max_concurrent]
+            if (product := self._products.get(asin)) and product.price_cents > 0
+        }
 
 
 class FakeHiBobClient:
@@ -4,15 +4,22 @@ from datetime import date
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from sqlalchemy import Update, create_engine, insert, select
 
+from src.models.orm.budget_adjustment import BudgetAdjustment
+from src.models.orm.order import Order
+from src.models.orm.user import User
 from src.services.budget_service import (
     calculate_total_budget_cents,
     check_budget_for_order,
     get_available_budget_cents,
     get_budget_timeline,
     get_live_adjustment_cents,
+    get_live_available_cents,
     get_live_spent_cents,
+    get_live_totals_cents,
     refresh_budget_cache,
+    refresh_budget_cache_many,
 )
 from tests.factories import make_user
 
@@ -168,6 +175,80 @@ class TestRefreshBudgetCache:
         assert mock_db.execute.call_count == 3
 
 
+class TestRefreshBudgetCacheMany:
+    @pytest.mark.asyncio
+    async def test_single_update_for_all_users(self, mock_db):
+        user_ids = [uuid.uuid4(), uuid.uuid4()]
+        await refresh_budget_cache_many(mock_db, user_ids)
+
+        mock_db.execute.assert_awaited_once()
+        stmt = mock_db.execute.await_args.args[0]
+        assert isinstance(stmt, Update)
+        assert stmt.table.name == "users"
+        assert {col.key for col in stmt._values} == {
+            "cached_spent_cents", "cached_adjustment_cents", "budget_cache_updated_at",
+        }
+        assert stmt.whereclause.right.value == user_ids
+
+    @pytest.mark.asyncio
+    async def test_no_users_no_query(self, mock_db):
+        await refresh_budget_cache_many(mock_db, set())
+        mock_db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_batch_totals_match_live_totals(self):
+        # Both statements run against an in-memory database, so the batch
+        # path is checked against the single-user one on real rows
+        engine = create_engine("sqlite://")
+        User.metadata.create_all(engine, tables=[User.__table__, Order.__table__, BudgetAdjustment.__table__])
+        user_id, other_id = uuid.uuid4(), uuid.uuid4()
+        with engine.begin() as conn:
+            conn.execute(insert(User), [
+                {"id": uid, "email": f"{uid}@example.com", "display_name": "U"} for uid in (user_id, other_id)
+            ])
+            conn.execute(insert(Order), [
+                {"user_id": user_id, "status": status, "total_cents": cents}
+                for status, cents in (
+                    ("pending", 100), ("ordered", 200), ("delivered", 400), ("return_requested", 800),
+                    ("returned", 1600), ("cancelled", 3200), ("rejected", 6400),
+                )
+            ] + [{"user_id": other_id, "status": "ordered", "total_cents": 5}])
+            conn.execute(insert(BudgetAdjustment), [
+                {"user_id": user_id, "amount_cents": cents, "reason": "r", "created_by": other_id, "source": "manual"}
+                for cents in (-300, 50)
+            ])
+
+            db = MagicMock()
+            db.execute = AsyncMock(side_effect=conn.execute)
+            live = await get_live_totals_cents(db, user_id)
+            await refresh_budget_cache_many(db, [user_id, other_id])
+            cached = conn.execute(
+                select(User.cached_spent_cents, User.cached_adjustment_cents).where(User.id == user_id)
+            ).one()
+
+        assert live == (3100, -250)
+        assert tuple(cached) == live
+
+
+class TestLiveTotals:
+    @pytest.mark.asyncio
+    async def test_available_from_single_query(self, mock_db):
+        result = MagicMock()
+        result.one.return_value = (25000, 5000)
+        mock_db.execute.return_value = result
+
+        assert await get_live_available_cents(mock_db, uuid.uuid4(), 75000) == 55000
+        mock_db.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_available_never_negative(self, mock_db):
+        result = MagicMock()
+        result.one.return_value = (90000, 0)
+        mock_db.execute.return_value = result
+
+        assert await get_live_available_cents(mock_db, uuid.uuid4(), 75000) == 0
+
+
 def _make_rule(effective_from, initial_cents, yearly_increment_cents):
     rule = MagicMock()
     rule.effective_from = effective_from
@@ -55,7 +55,7 @@ class TestSyncEmployees:
         mock_user_repo.get_by_hibob_id = AsyncMock(return_value=None)
         mock_user_repo.get_by_email = AsyncMock(return_value=None)
         mock_user_repo.get_all_with_hibob_id = AsyncMock(return_value=[])
-        mock_user_repo.get_active_staff = AsyncMock(return_value=[])
+        mock_user_repo.get_first_active_staff_id = AsyncMock(return_value=None)
 
         employees = [
             HiBobEmployee(
@@ -82,7 +82,7 @@ class TestSyncEmployees:
         existing_user = make_user(email="existing@example.com", display_name="Old Name")
         mock_user_repo.get_by_hibob_id = AsyncMock(return_value=existing_user)
         mock_user_repo.get_all_with_hibob_id = AsyncMock(return_value=[existing_user])
-        mock_user_repo.get_active_staff = AsyncMock(return_value=[])
+        mock_user_repo.get_first_active_staff_id = AsyncMock(return_value=None)
 
         employees = [
             HiBobEmployee(
@@ -108,7 +108,7 @@ class TestSyncEmployees:
     ):
         mock_settings.return_value = {}
         mock_budget.return_value = 75000
-        mock_user_repo.get_active_staff = AsyncMock(return_value=[])
+        mock_user_repo.get_first_active_staff_id = AsyncMock(return_value=None)
 
         employees = [
             HiBobEmployee(id="ext-1", email="external@other-company.com", display_name="External"),
@@ -129,7 +129,7 @@ class TestSyncEmployees:
     ):
         mock_settings.return_value = {}
         mock_budget.return_value = 75000
-        mock_user_repo.get_active_staff = AsyncMock(return_value=[])
+        mock_user_repo.get_first_active_staff_id = AsyncMock(return_value=None)
 
         employees = [
             HiBobEmployee(id="no-email", email="", display_name="No Email"),
@@ -151,7 +151,7 @@ class TestSyncEmployees:
         mock_user_repo.get_by_hibob_id = AsyncMock(return_value=None)
         mock_user_repo.get_by_email = AsyncMock(return_value=None)
         mock_user_repo.get_all_with_hibob_id = AsyncMock(return_value=[])
-        mock_user_repo.get_active_staff = AsyncMock(return_value=[])
+        mock_user_repo.get_first_active_staff_id = AsyncMock(return_value=None)
 
         employees = [
             HiBobEmployee(
@@ -204,7 +204,7 @@ class TestSyncEmployees:
         mock_user_repo.get_by_hibob_id = AsyncMock(return_value=None)
         mock_user_repo.get_by_email = AsyncMock(return_value=existing)
         mock_user_repo.get_all_with_hibob_id = AsyncMock(return_value=[])
-        mock_user_repo.get_active_staff = AsyncMock(return_value=[])
+        mock_user_repo.get_first_active_staff_id = AsyncMock(return_value=None)
 
         employees = [
             HiBobEmployee(id="new-hibob-id", email="match@example.com", display_name="Matched"),
@@ -1,14 +1,18 @@
 """Tests for order state machine and order service."""
 import uuid
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+import sqlalchemy as sa
 from fastapi import HTTPException
 
 from src.core.exceptions import BadRequestError, ConflictError, InvalidStatusTransitionError, NotFoundError
+from src.models.orm.order import Order
 from src.services.order_service import (
     VALID_TRANSITIONS,
     create_order_from_cart,
+    get_recent_orders,
     transition_order,
 )
 from tests.factories import make_cart_item, make_order, make_product, make_user
@@ -225,3 +229,23 @@ class TestCreateOrderFromCart:
 
         with pytest.raises(BadRequestError, match="Insufficient budget"):
             await create_order_from_cart(mock_db, user_id)
+
+
+class TestGetRecentOrders:
+    @pytest.mark.asyncio
+    async def test_keyset_after_cursor(self, mock_db):
+        result = MagicMock()
+        result.scalars.return_value.unique.return_value.all.return_value = []
+        mock_db.execute.return_value = result
+        cursor = (datetime(2024, 6, 3, tzinfo=timezone.utc), uuid.uuid4())
+
+        orders = await get_recent_orders(mock_db, uuid.uuid4(), limit=10, before=cursor)
+
+        assert orders == []
+        stmt = mock_db.execute.await_args.args[0]
+        keyset = stmt.whereclause.clauses[-1]
+        assert keyset.compare(sa.tuple_(Order.created_at, Order.id) < sa.tuple_(*cursor))
+        assert [c.compare(e) for c, e in zip(
+            stmt._order_by_clauses, (Order.created_at.desc(), Order.id.desc()), strict=True,
+        )] == [True, True]
+        assert stmt._offset_clause is None
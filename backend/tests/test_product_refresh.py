@@ -3,11 +3,15 @@ import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from sqlalchemy import Update, Values
+from sqlalchemy.dialects.postgresql import Insert
+from sqlalchemy.dialects.postgresql.dml import OnConflictDoUpdate
 
 from src.core.exceptions import BadRequestError, NotFoundError
 from src.integrations.amazon.models import AmazonProduct
 from src.models.dto.product import RefreshApplyRequest
-from tests.factories import make_product, make_user
+from src.services.product_service import refresh_all_prices
+from tests.factories import FakeAmazonClient, make_product, make_user
 
 
 def _make_request(ip: str = "127.0.0.1"):
@@ -17,6 +21,14 @@ def _make_request(ip: str = "127.0.0.1"):
     return req
 
 
+def _mock_db_stream(mock_db, rows):
+    async def _iter():
+        for row in rows:
+            yield row
+
+    mock_db.stream = AsyncMock(return_value=_iter())
+
+
 def _mock_db_get(mock_db, return_value):
     mock_db.get = AsyncMock(return_value=return_value)
     mock_db.refresh = AsyncMock()
@@ -48,8 +60,8 @@ class TestRefreshPreview:
     @pytest.mark.asyncio
     @patch("src.audit.service.write_audit_log", new_callable=AsyncMock)
     @patch("src.services.product_service.download_and_store_product_images", new_callable=AsyncMock)
-    @patch("src.services.product_service.AmazonClient")
-    async def test_returns_diffs(self, MockClient, mock_download, mock_audit, mock_db):
+    @patch("src.services.product_service.shared_amazon_client", new_callable=AsyncMock)
+    async def test_returns_diffs(self, mock_client, mock_download, mock_audit, mock_db):
         from src.api.routes.admin.products import refresh_preview
 
         product = make_product(name="Old Name", price_cents=10000, brand="OldBrand")
@@ -71,9 +83,7 @@ class TestRefreshPreview:
             images=["https://img.example.com/1.jpg"],
             color="Black",
         )
-        client_instance = AsyncMock()
-        client_instance.get_product = AsyncMock(return_value=amazon_data)
-        MockClient.return_value = client_instance
+        mock_client.get_product = AsyncMock(return_value=amazon_data)
 
         mock_download.return_value = MagicMock(main_image="/uploads/main.jpg", gallery=[])
 
@@ -90,8 +100,8 @@ class TestRefreshPreview:
     @pytest.mark.asyncio
     @patch("src.audit.service.write_audit_log", new_callable=AsyncMock)
     @patch("src.services.product_service.download_and_store_product_images", new_callable=AsyncMock)
-    @patch("src.services.product_service.AmazonClient")
-    async def test_no_diffs_when_same(self, MockClient, mock_download, mock_audit, mock_db):
+    @patch("src.services.product_service.shared_amazon_client", new_callable=AsyncMock)
+    async def test_no_diffs_when_same(self, mock_client, mock_download, mock_audit, mock_db):
         from src.api.routes.admin.products import refresh_preview
 
         product = make_product(name="Same Name", price_cents=35000, brand="SameBrand")
@@ -114,9 +124,7 @@ class TestRefreshPreview:
             color="Red",
             description="A test product",
         )
-        client_instance = AsyncMock()
-        client_instance.get_product = AsyncMock(return_value=amazon_data)
-        MockClient.return_value = client_instance
+        mock_client.get_product = AsyncMock(return_value=amazon_data)
 
         mock_download.return_value = MagicMock(main_image="/uploads/main.jpg", gallery=[])
 
@@ -128,8 +136,8 @@ class TestRefreshPreview:
     @pytest.mark.asyncio
     @patch("src.audit.service.write_audit_log", new_callable=AsyncMock)
     @patch("src.services.product_service.download_and_store_product_images", new_callable=AsyncMock)
-    @patch("src.services.product_service.AmazonClient")
-    async def test_skips_none_new_values(self, MockClient, mock_download, mock_audit, mock_db):
+    @patch("src.services.product_service.shared_amazon_client", new_callable=AsyncMock)
+    async def test_skips_none_new_values(self, mock_client, mock_download, mock_audit, mock_db):
         from src.api.routes.admin.products import refresh_preview
 
         product = make_product(name="Name", price_cents=10000, brand="Brand")
@@ -151,9 +159,7 @@ class TestRefreshPreview:
             brand="Brand",
             images=[],
         )
-        client_instance = AsyncMock()
-        client_instance.get_product = AsyncMock(return_value=amazon_data)
-        MockClient.return_value = client_instance
+        mock_client.get_product = AsyncMock(return_value=amazon_data)
 
         mock_download.return_value = MagicMock(main_image="/uploads/main.jpg", gallery=[])
 
@@ -222,9 +228,9 @@ class TestRefreshApply:
         product.amazon_asin = "B08TEST123"
         _mock_db_get(mock_db, product)
 
-        # simulate no existing brand found
+        new_brand_id = uuid.uuid4()
         result_mock = MagicMock()
-        result_mock.scalar_one_or_none.return_value = None
+        result_mock.scalar_one.return_value = new_brand_id
         mock_db.execute = AsyncMock(return_value=result_mock)
 
         admin = make_user(role="admin")
@@ -236,11 +242,18 @@ class TestRefreshApply:
         await refresh_apply(product.id, body, _make_request(), mock_db, admin)
 
         assert product.brand == "NewBrand"
-        # A new brand should have been added
-        mock_db.add.assert_called()
-        added = mock_db.add.call_args[0][0]
-        assert added.name == "NewBrand"
-        assert added.slug == "newbrand"
+        assert product.brand_id == new_brand_id
+        # The brand is upserted by name in a single statement
+        stmt = mock_db.execute.await_args.args[0]
+        assert isinstance(stmt, Insert)
+        assert stmt.table.name == "brands"
+        conflict = stmt._post_values_clause
+        assert isinstance(conflict, OnConflictDoUpdate)
+        assert [col.key for col in conflict.inferred_target_elements] == ["name"]
+        assert [col.key for col in stmt._returning] == ["id"]
+        params = stmt.compile().params
+        assert params["name"] == "NewBrand"
+        assert params["slug"] == "newbrand"
 
     @pytest.mark.asyncio
     @patch("src.audit.service.write_audit_log", new_callable=AsyncMock)
@@ -252,11 +265,9 @@ class TestRefreshApply:
         _mock_db_get(mock_db, product)
 
         existing_brand_id = uuid.uuid4()
-        existing_brand = MagicMock()
-        existing_brand.id = existing_brand_id
 
         result_mock = MagicMock()
-        result_mock.scalar_one_or_none.return_value = existing_brand
+        result_mock.scalar_one.return_value = existing_brand_id
         mock_db.execute = AsyncMock(return_value=result_mock)
 
         admin = make_user(role="admin")
@@ -271,6 +282,66 @@ class TestRefreshApply:
         assert product.brand_id == existing_brand_id
 
 
+class TestRefreshAllPrices:
+    @pytest.mark.asyncio
+    async def test_writes_changed_prices_in_one_update(self, mock_db):
+        changed = make_product(price_cents=10000)
+        changed.amazon_asin = "B0CHANGED1"
+        unchanged = make_product(price_cents=20000)
+        unchanged.amazon_asin = "B0SAME0001"
+
+        _mock_db_stream(mock_db, [
+            (p.id, p.amazon_asin, p.price_cents) for p in (changed, unchanged)
+        ])
+
+        client = FakeAmazonClient({
+            "B0CHANGED1": AmazonProduct(name="A", price_cents=12000),
+            "B0SAME0001": AmazonProduct(name="B", price_cents=20000),
+        })
+        result = await refresh_all_prices(mock_db, client)
+
+        assert result == {"total": 2, "updated": 1, "errors": 0}
+        mock_db.execute.assert_awaited_once()
+        stmt = mock_db.execute.await_args.args[0]
+        assert isinstance(stmt, Update)
+        assert stmt.table.name == "products"
+        new_prices = stmt.whereclause.right.table
+        assert isinstance(new_prices, Values)
+        assert new_prices._data == ([(changed.id, 12000)],)
+
+    @pytest.mark.asyncio
+    async def test_no_update_when_nothing_changed(self, mock_db):
+        product = make_product(price_cents=20000)
+        product.amazon_asin = "B0SAME0001"
+        _mock_db_stream(mock_db, [(product.id, product.amazon_asin, product.price_cents)])
+
+        client = FakeAmazonClient({"B0SAME0001": AmazonProduct(name="B", price_cents=20000)})
+        result = await refresh_all_prices(mock_db, client)
+
+        assert result["updated"] == 0
+        mock_db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_lookups_counted_and_pool_drains(self, mock_db):
+        products = [make_product(price_cents=10000) for _ in range(5)]
+        for i, p in enumerate(products):
+            p.amazon_asin = f"B0ASIN000{i}"
+        _mock_db_stream(mock_db, [(p.id, p.amazon_asin, p.price_cents) for p in products])
+
+        client = FakeAmazonClient({p.amazon_asin: AmazonProduct(name="A", price_cents=11000) for p in products})
+        real_lookup = client.get_current_price
+
+        async def _flaky(asin):
+            if asin == "B0ASIN0002":
+                raise RuntimeError("throttled")
+            return await real_lookup(asin)
+
+        client.get_current_price = _flaky
+        result = await refresh_all_prices(mock_db, client, concurrency=2)
+
+        assert result == {"total": 5, "updated": 4, "errors": 1}
+
+
 class TestBrandExtraction:
     """Test that brand is extracted from product_information only, not top-level data."""
 
@@ -0,0 +1,320 @@
+"""Tests for product search query helpers and response caching."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.core.exceptions import BadRequestError
+from src.services.product_service import (
+    _build_prefix_tsquery,
+    _compile_search_terms,
+    _expand_with_synonyms,
+    _load_facets,
+    _similarity_threshold,
+    _trigram_matches,
+    invalidate_search_cache,
+    search_products,
+)
+from tests.factories import make_product
+
+
+class TestBuildPrefixTsquery:
+    def test_single_word(self):
+        assert _build_prefix_tsquery("key") == "key:*"
+
+    def test_prefix_on_last_term_only(self):
+        assert _build_prefix_tsquery("wire key") == "wire & key:*"
+
+    def test_strips_punctuation(self):
+        assert _build_prefix_tsquery("usb-c hub!") == "usbc & hub:*"
+
+    def test_empty_returns_none(self):
+        assert _build_prefix_tsquery("   ") is None
+        assert _build_prefix_tsquery("!! ??") is None
+
+
+class TestCompileSearchTerms:
+    def test_short_last_term_gets_prefix(self):
+        assert _compile_search_terms("wireless key") == ("wireless & key:*", None)
+
+    def test_long_last_term_skips_prefix(self):
+        assert _compile_search_terms("standing desktop") == (None, None)
+
+    def test_synonyms_independent_of_prefix(self):
+        assert _compile_search_terms("notebook") == (None, "(notebook | laptop)")
+
+
+class TestExpandWithSynonyms:
+    def test_single_word_synonym(self):
+        assert _expand_with_synonyms("notebook case") == ("(notebook | laptop) & case", True)
+
+    def test_multi_word_alternative_is_phrase(self):
+        assert _expand_with_synonyms("ssd") == ("(ssd | solid <-> state <-> drive)", True)
+
+    def test_multi_word_key_matched(self):
+        assert _expand_with_synonyms("Solid State Drive 1TB") == ("(solid <-> state <-> drive | ssd) & 1tb", True)
+
+    def test_partial_phrase_not_matched(self):
+        assert _expand_with_synonyms("hard case") == ("hard & case", False)
+
+    def test_no_synonyms(self):
+        assert _expand_with_synonyms("standing desk") == ("standing & desk", False)
+
+    def test_punctuation_alone_is_not_a_hit(self):
+        assert _expand_with_synonyms("desk!") == ("desk", False)
+
+
+class TestTrigramMatches:
+    def test_long_query_uses_operator_only(self):
+        matches = _trigram_matches("ergonomic office chair with adjustable armrests")
+
+        sql = [str(m.compile(dialect=postgresql.dialect())) for m in matches]
+        assert sql == ["products.name %% %(name_1)s", "products.brand %% %(brand_1)s"]
+
+    def test_short_query_adds_stricter_similarity(self):
+        name_match, _ = _trigram_matches("dell")
+
+        trigram, similarity = name_match.clauses
+        assert trigram.element.operator.opstring == "%"
+        assert similarity.left.name == "similarity"
+        assert similarity.right.value == _similarity_threshold("dell")
+
+    @pytest.mark.parametrize(("q", "threshold"), [
+        ("ssd", 0.6),
+        ("standing desk", 0.45),
+        ("x" * 30, 0.3),
+    ])
+    def test_threshold_by_length(self, q, threshold):
+        assert _similarity_threshold(q) == threshold
+
+
+def _page_result(total=1, products=None):
+    """A mocked page query result: one row per product, carrying the window total."""
+    rows = []
+    for product in products if products is not None else [make_product()]:
+        row = MagicMock(total=total, sort_key=product.created_at)
+        row.__getitem__.side_effect = lambda i, product=product: product
+        rows.append(row)
+    result = MagicMock()
+    result.all.return_value = rows
+    return result
+
+
+class TestSearchResponseCache:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        invalidate_search_cache()
+        yield
+        invalidate_search_cache()
+
+    @pytest.fixture(autouse=True)
+    def _mock_facets(self):
+        with patch(
+            "src.services.product_service._load_facets",
+            new_callable=AsyncMock, return_value={"brands": []},
+        ) as mock_facets:
+            yield mock_facets
+
+    def _mock_search_db(self, mock_db):
+        mock_db.execute = AsyncMock(return_value=_page_result())
+
+    @pytest.mark.asyncio
+    async def test_first_page_served_from_cache(self, mock_db):
+        self._mock_search_db(mock_db)
+
+        first = await search_products(mock_db, q="Standing  Desk")
+        second = await search_products(mock_db, q="standing desk")
+
+        assert first == second
+        assert first["facets"] == {"brands": []}
+        assert mock_db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_response_not_mutated_by_caller(self, mock_db):
+        self._mock_search_db(mock_db)
+
+        first = await search_products(mock_db, q="desk")
+        name = first["items"][0]["name"]
+        first["items"][0]["name"] = "changed"
+        first["items"].append({})
+        second = await search_products(mock_db, q="desk")
+
+        assert len(second["items"]) == 1
+        assert second["items"][0]["name"] == name
+
+    @pytest.mark.asyncio
+    async def test_later_pages_not_cached(self, mock_db):
+        self._mock_search_db(mock_db)
+
+        await search_products(mock_db, q="desk", page=2)
+        await search_products(mock_db, q="desk", page=2)
+
+        assert mock_db.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidated_on_write(self, mock_db):
+        self._mock_search_db(mock_db)
+
+        await search_products(mock_db, q="desk")
+        invalidate_search_cache()
+        await search_products(mock_db, q="desk")
+
+        assert mock_db.execute.await_count == 2
+
+
+class TestSearchTotal:
+    @pytest.fixture(autouse=True)
+    def _mock_facets(self):
+        invalidate_search_cache()
+        with patch(
+            "src.services.product_service._load_facets",
+            new_callable=AsyncMock, return_value={},
+        ):
+            yield
+        invalidate_search_cache()
+
+    @pytest.mark.asyncio
+    async def test_total_from_window_count(self, mock_db):
+        product = make_product()
+        mock_db.execute = AsyncMock(return_value=_page_result(42, [product]))
+
+        result = await search_products(mock_db, q="desk")
+
+        assert result["total"] == 42
+        assert [item["id"] for item in result["items"]] == [product.id]
+        mock_db.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_selects_only_list_columns(self, mock_db):
+        mock_db.execute = AsyncMock(return_value=_page_result())
+
+        await search_products(mock_db, q="desk")
+
+        [page] = mock_db.execute.await_args.args[0].get_final_froms()
+        columns = set(page.c.keys())
+        assert "name" in columns
+        assert not {"search_vector", "specifications", "product_information"} & columns
+
+    @pytest.mark.asyncio
+    async def test_page_past_end_still_reports_total(self, mock_db):
+        page_result = MagicMock()
+        page_result.all.return_value = []
+        count_result = MagicMock()
+        count_result.scalar_one.return_value = 7
+        mock_db.execute = AsyncMock(side_effect=[page_result, count_result])
+
+        result = await search_products(mock_db, q="desk", page=5)
+
+        assert result["items"] == []
+        assert result["total"] == 7
+
+
+class TestFacetTaskCleanup:
+    @pytest.mark.asyncio
+    async def test_facet_load_cancelled_when_count_fails(self, mock_db):
+        invalidate_search_cache()
+        empty_page = MagicMock()
+        empty_page.all.return_value = []
+        mock_db.execute = AsyncMock(side_effect=[empty_page, RuntimeError("count failed")])
+
+        async def never_finishes():
+            await asyncio.Event().wait()
+
+        with patch("src.services.product_service._load_facets", never_finishes):
+            with pytest.raises(RuntimeError, match="count failed"):
+                await search_products(mock_db, q="desk", page=3)
+            await asyncio.sleep(0)
+
+        others = asyncio.all_tasks() - {asyncio.current_task()}
+        assert all(task.done() for task in others)
+
+
+class TestFacetCache:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        invalidate_search_cache()
+        yield
+        invalidate_search_cache()
+
+    def _mock_session_factory(self, facets):
+        session = AsyncMock()
+        result = MagicMock()
+        result.scalar_one.return_value = facets
+        session.execute = AsyncMock(return_value=result)
+        factory = MagicMock()
+        factory.return_value.__aenter__ = AsyncMock(return_value=session)
+        factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        return factory, session
+
+    @pytest.mark.asyncio
+    async def test_facets_loaded_once_until_invalidated(self):
+        factory, session = self._mock_session_factory({"brands": [{"value": "Dell", "count": 2}]})
+        with patch("src.core.database.async_session_factory", factory):
+            first = await _load_facets()
+            second = await _load_facets()
+            invalidate_search_cache()
+            await _load_facets()
+
+        assert first == second == {"brands": [{"value": "Dell", "count": 2}]}
+        assert session.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_search_skips_side_session_when_facets_cached(self, mock_db):
+        factory, _ = self._mock_session_factory({"brands": []})
+        with patch("src.core.database.async_session_factory", factory):
+            await _load_facets()
+            mock_db.execute = AsyncMock(return_value=_page_result(total=0, products=[]))
+
+            result = await search_products(mock_db, q="desk")
+
+        assert result["facets"] == {"brands": []}
+        assert factory.call_count == 1
+
+
+class TestSearchCursor:
+    @pytest.fixture(autouse=True)
+    def _mock_facets(self):
+        invalidate_search_cache()
+        with patch(
+            "src.services.product_service._load_facets",
+            new_callable=AsyncMock, return_value={},
+        ):
+            yield
+        invalidate_search_cache()
+
+    async def _newest_cursor(self, mock_db, **filters):
+        mock_db.execute = AsyncMock(return_value=_page_result(5))
+
+        result = await search_products(mock_db, sort="newest", per_page=1, **filters)
+        return result["next_cursor"]
+
+    @pytest.mark.asyncio
+    async def test_cursor_continues_same_query(self, mock_db):
+        cursor = await self._newest_cursor(mock_db, brand="Dell")
+
+        result = await search_products(mock_db, sort="newest", per_page=1, brand="Dell", cursor=cursor)
+
+        assert result["total"] == 5
+        assert mock_db.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("sort", ["name_asc", "price_asc", "relevance"])
+    async def test_cursor_rejected_under_other_sort(self, mock_db, sort):
+        cursor = await self._newest_cursor(mock_db)
+
+        with pytest.raises(BadRequestError, match="Invalid cursor"):
+            await search_products(mock_db, sort=sort, cursor=cursor)
+        assert mock_db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cursor_rejected_under_other_filters(self, mock_db):
+        cursor = await self._newest_cursor(mock_db, brand="Dell")
+
+        with pytest.raises(BadRequestError, match="Invalid cursor"):
+            await search_products(mock_db, sort="newest", brand="HP", cursor=cursor)
+
+    @pytest.mark.asyncio
+    async def test_malformed_cursor_rejected(self, mock_db):
+        with pytest.raises(BadRequestError, match="Invalid cursor"):
+            await search_products(mock_db, sort="newest", cursor="not-a-cursor")
@@ -8,13 +8,35 @@ import pytest
 from tests.factories import FakeHiBobClient
 from src.models.orm.order import Order
 from src.services.purchase_sync import (
+    _candidate_orders,
+    _fetch_custom_tables,
     _find_matching_orders,
+    _index_orders,
     _parse_amount_cents,
+    _parse_entries,
     sync_purchases,
 )
 from tests.factories import make_order, make_user
 
 
+def _mock_sync_db(mock_db, users, *more_chunks):
+    """Stream ``users`` (then ``more_chunks``) from the user query; every
+    other query returns no rows."""
+    async def _partitions():
+        for chunk in (users, *more_chunks):
+            if chunk:
+                yield chunk
+
+    users_result = MagicMock()
+    users_result.partitions = _partitions
+    mock_db.stream_scalars = AsyncMock(return_value=users_result)
+
+    empty = MagicMock()
+    empty.scalars.return_value.all.return_value = []
+    empty.all.return_value = []
+    mock_db.execute = AsyncMock(return_value=empty)
+
+
 class TestParseAmountCents:
     def test_simple_decimal(self):
         assert _parse_amount_cents("750.00") == 75000
@@ -48,6 +70,28 @@ class TestParseAmountCents:
         assert _parse_amount_cents("10.000,00") == 1000000
 
 
+class TestParseEntries:
+    COLS = ("Effective date", "Description", "Amount", "Currency")
+
+    def test_rows_stay_aligned_and_bad_rows_are_none(self):
+        uid = uuid.uuid4()
+        rows = [
+            {"id": "1", "Effective date": "2024-03-01", "Description": "Desk",
+             "Amount": {"value": 270, "currency": "USD"}},
+            {"id": "2", "Description": "No date", "Amount": "10"},
+            {"id": "3", "Effective date": "2024-03-02", "Amount": "12,50"},
+        ]
+
+        parsed = _parse_entries({uid: rows}, *self.COLS)[uid]
+
+        assert parsed[0].amount_cents == 27000
+        assert parsed[0].currency == "USD"
+        assert parsed[1] is None
+        assert parsed[2].entry_date == date(2024, 3, 2)
+        assert parsed[2].amount_cents == 1250
+        assert parsed[2].currency == "EUR"
+
+
 class TestFindMatchingOrders:
     def _make_order(self, total_cents, days_ago=0, status="pending"):
         order = make_order(
@@ -102,15 +146,69 @@ class TestFindMatchingOrders:
         assert len(matches) == 2
 
 
+class TestOrderIndex:
+    def _order(self, total_cents, day):
+        order = make_order(user_id=uuid.uuid4(), total_cents=total_cents, status="ordered")
+        order.created_at = datetime(2024, 6, day, tzinfo=timezone.utc)
+        return order
+
+    @pytest.mark.parametrize(("amount_tolerance", "date_tolerance"), [(0, 0), (100, 7), (500, 30)])
+    def test_candidates_include_every_match(self, amount_tolerance, date_tolerance):
+        orders = [
+            self._order(total, day)
+            for total in (74000, 74900, 75000, 75100, 75600, 90000)
+            for day in (1, 8, 14, 15, 16, 22, 30)
+        ]
+        index = _index_orders(orders, amount_tolerance, date_tolerance)
+        entry_date = date(2024, 6, 15)
+
+        candidates = _candidate_orders(index, 75000, entry_date, amount_tolerance, date_tolerance)
+        expected = _find_matching_orders(orders, 75000, entry_date, amount_tolerance, date_tolerance)
+
+        assert {o.id for o in _find_matching_orders(
+            candidates, 75000, entry_date, amount_tolerance, date_tolerance,
+        )} == {o.id for o in expected}
+        assert len(candidates) < len(orders)
+
+
+    def test_index_skips_unmatchable_statuses(self):
+        cancelled = self._order(75000, 15)
+        cancelled.status = "cancelled"
+        index = _index_orders([cancelled, self._order(75000, 15)], 100, 7)
+
+        assert len(_candidate_orders(index, 75000, date(2024, 6, 15), 100, 7)) == 1
+
+
+class TestFetchCustomTables:
+    @pytest.mark.asyncio
+    @patch("src.services.purchase_sync.asyncio.sleep", new_callable=AsyncMock)
+    async def test_collects_rows_and_skips_failures(self, mock_sleep):
+        ok, empty, broken = (make_user(hibob_id=h) for h in ("emp-1", "emp-2", "emp-3"))
+        client = FakeHiBobClient(custom_tables={("emp-1", "purchases"): [{"id": "entry-1"}]})
+        real_get = client.get_custom_table
+
+        async def _get(employee_id, table_id):
+            if employee_id == "emp-3":
+                raise RuntimeError("boom")
+            return await real_get(employee_id, table_id)
+
+        client.get_custom_table = _get
+        rows = await _fetch_custom_tables(client, [ok, empty, broken], "purchases", 1.5)
+
+        assert rows == {ok.id: [{"id": "entry-1"}]}
+        assert [c.args for c in mock_sleep.await_args_list] == [(1.5,), (1.5,)]
+
+
 class TestSyncPurchases:
     @pytest.mark.asyncio
-    @patch("src.services.purchase_sync.load_settings", new_callable=AsyncMock)
+    @patch("src.services.purchase_sync.load_settings_if_stale", new_callable=AsyncMock)
     @patch("src.services.purchase_sync.get_setting")
-    @patch("src.services.purchase_sync.refresh_budget_cache")
+    @patch("src.services.purchase_sync.refresh_budget_cache_many")
     async def test_fails_when_table_not_configured(
         self, mock_refresh, mock_get_setting, mock_load, mock_db,
     ):
         mock_get_setting.return_value = ""  # empty table_id
+        _mock_sync_db(mock_db, [])
 
         client = FakeHiBobClient()
         log = await sync_purchases(mock_db, client)
@@ -120,10 +218,10 @@ class TestSyncPurchases:
     @pytest.mark.asyncio
     @patch("src.services.purchase_sync.write_audit_log", new_callable=AsyncMock)
     @patch("src.services.purchase_sync.asyncio.sleep", new_callable=AsyncMock)
-    @patch("src.services.purchase_sync.load_settings", new_callable=AsyncMock)
+    @patch("src.services.purchase_sync.load_settings_if_stale", new_callable=AsyncMock)
     @patch("src.services.purchase_sync.get_setting")
     @patch("src.services.purchase_sync.get_setting_int")
-    @patch("src.services.purchase_sync.refresh_budget_cache", new_callable=AsyncMock)
+    @patch("src.services.purchase_sync.refresh_budget_cache_many", new_callable=AsyncMock)
     async def test_no_users_with_hibob_id(
         self, mock_refresh, mock_get_setting_int, mock_get_setting, mock_load, mock_sleep, mock_audit, mock_db,
     ):
@@ -139,24 +237,32 @@ class TestSyncPurchases:
         mock_get_setting.side_effect = setting_side_effect
         mock_get_setting_int.return_value = 500
 
-        # Mock execute to return empty results for all calls
-        mock_result = MagicMock()
-        mock_result.scalars.return_value.all.return_value = []
-        mock_result.all.return_value = []
-        mock_db.execute = AsyncMock(return_value=mock_result)
+        _mock_sync_db(mock_db, [])
 
         client = FakeHiBobClient()
         log = await sync_purchases(mock_db, client)
         assert log.status == "completed"
         assert log.entries_found == 0
 
+    @pytest.mark.asyncio
+    async def test_skipped_when_another_worker_holds_lock(self, mock_db):
+        _mock_sync_db(mock_db, [make_user(hibob_id="hb-1")])
+        mock_db.execute.return_value.scalar.return_value = False
+
+        client = FakeHiBobClient()
+        log = await sync_purchases(mock_db, client)
+
+        assert log.status == "skipped_locked"
+        assert mock_db.execute.await_count == 1
+        mock_db.stream_scalars.assert_not_called()
+
     @pytest.mark.asyncio
     @patch("src.services.purchase_sync.write_audit_log", new_callable=AsyncMock)
     @patch("src.services.purchase_sync.asyncio.sleep", new_callable=AsyncMock)
-    @patch("src.services.purchase_sync.load_settings", new_callable=AsyncMock)
+    @patch("src.services.purchase_sync.load_settings_if_stale", new_callable=AsyncMock)
     @patch("src.services.purchase_sync.get_setting")
     @patch("src.services.purchase_sync.get_setting_int")
-    @patch("src.services.purchase_sync.refresh_budget_cache", new_callable=AsyncMock)
+    @patch("src.services.purchase_sync.refresh_budget_cache_many", new_callable=AsyncMock)
     async def test_reprocesses_all_entries_on_resync(
         self, mock_refresh, mock_get_setting_int, mock_get_setting, mock_load, mock_sleep, mock_audit, mock_db,
     ):
@@ -176,26 +282,7 @@ class TestSyncPurchases:
         user = make_user(hibob_id="emp-1")
         user.hibob_id = "emp-1"
 
-        users_found = False
-
-        async def execute_side_effect(stmt):
-            nonlocal users_found
-            mock_result = MagicMock()
-            stmt_str = str(stmt)
-            # The users query contains User and is_active
-            if not users_found and "is_active" in stmt_str:
-                mock_result.scalars.return_value.all.return_value = [user]
-                users_found = True
-            elif "status" in stmt_str:
-                # Orders query
-                mock_result.scalars.return_value.all.return_value = []
-            else:
-                mock_result.scalars.return_value.all.return_value = []
-                mock_result.all.return_value = []
-                mock_result.scalar_one_or_none.return_value = None
-            return mock_result
-
-        mock_db.execute = AsyncMock(side_effect=execute_side_effect)
+        _mock_sync_db(mock_db, [user])
 
         client = FakeHiBobClient(
             custom_tables={
@@ -212,10 +299,10 @@ class TestSyncPurchases:
     @pytest.mark.asyncio
     @patch("src.services.purchase_sync.write_audit_log", new_callable=AsyncMock)
     @patch("src.services.purchase_sync.asyncio.sleep", new_callable=AsyncMock)
-    @patch("src.services.purchase_sync.load_settings", new_callable=AsyncMock)
+    @patch("src.services.purchase_sync.load_settings_if_stale", new_callable=AsyncMock)
     @patch("src.services.purchase_sync.get_setting")
     @patch("src.services.purchase_sync.get_setting_int")
-    @patch("src.services.purchase_sync.refresh_budget_cache", new_callable=AsyncMock)
+    @patch("src.services.purchase_sync.refresh_budget_cache_many", new_callable=AsyncMock)
     async def test_auto_adjust_no_matching_order(
         self, mock_refresh, mock_get_setting_int, mock_get_setting, mock_load, mock_sleep, mock_audit, mock_db,
     ):
@@ -234,24 +321,7 @@ class TestSyncPurchases:
         user = make_user(hibob_id="emp-1")
         user.hibob_id = "emp-1"
 
-        users_found = False
-
-        async def execute_side_effect(stmt):
-            nonlocal users_found
-            mock_result = MagicMock()
-            stmt_str = str(stmt)
-            if not users_found and "is_active" in stmt_str:
-                mock_result.scalars.return_value.all.return_value = [user]
-                users_found = True
-            elif "status" in stmt_str:
-                mock_result.scalars.return_value.all.return_value = []
-            else:
-                mock_result.scalars.return_value.all.return_value = []
-                mock_result.all.return_value = []
-                mock_result.scalar_one_or_none.return_value = None
-            return mock_result
-
-        mock_db.execute = AsyncMock(side_effect=execute_side_effect)
+        _mock_sync_db(mock_db, [user])
 
         client = FakeHiBobClient(
             custom_tables={
@@ -269,13 +339,100 @@ class TestSyncPurchases:
         assert log.matched == 0
         assert log.pending_review == 0
 
-        # Verify a BudgetAdjustment was added
-        add_calls = mock_db.add.call_args_list
-        adjustments = [c for c in add_calls if hasattr(c[0][0], 'source') and getattr(c[0][0], 'source', None) == 'hibob']
-        assert len(adjustments) >= 1
-        adj = adjustments[0][0][0]
-        assert adj.amount_cents == -75000
-        assert adj.hibob_entry_id == "entry-1"
+        # Verify the adjustment and its review were bulk-inserted
+        bulk = {
+            c.args[0].table.name: c.args[1]
+            for c in mock_db.execute.await_args_list
+            if len(c.args) == 2
+        }
+        [adj] = bulk["budget_adjustments"]
+        assert adj["amount_cents"] == -75000
+        assert adj["hibob_entry_id"] == "entry-1"
+        assert adj["source"] == "hibob"
+        [review] = bulk["hibob_purchase_reviews"]
+        assert review["status"] == "adjusted"
+        assert review["adjustment_id"] == adj["id"]
+        mock_refresh.assert_awaited_once_with(mock_db, {user.id})
+
+    @pytest.mark.asyncio
+    @patch("src.services.purchase_sync.write_audit_log", new_callable=AsyncMock)
+    @patch("src.services.purchase_sync.asyncio.sleep", new_callable=AsyncMock)
+    @patch("src.services.purchase_sync.load_settings_if_stale", new_callable=AsyncMock)
+    @patch("src.services.purchase_sync.get_setting")
+    @patch("src.services.purchase_sync.get_setting_int")
+    @patch("src.services.purchase_sync.refresh_budget_cache_many", new_callable=AsyncMock)
+    async def test_duplicate_entry_ids_processed_once(
+        self, mock_refresh, mock_get_setting_int, mock_get_setting, mock_load, mock_sleep, mock_audit, mock_db,
+    ):
+        def setting_side_effect(key):
+            return {
+                "hibob_purchase_table_id": "purchases",
+                "hibob_purchase_col_date": "date",
+                "hibob_purchase_col_description": "desc",
+                "hibob_purchase_col_amount": "amount",
+                "hibob_purchase_col_currency": "currency",
+            }.get(key, "")
+
+        mock_get_setting.side_effect = setting_side_effect
+        mock_get_setting_int.return_value = 500
+
+        user = make_user(hibob_id="emp-1")
+        user.hibob_id = "emp-1"
+
+        _mock_sync_db(mock_db, [user])
+
+        entry = {"id": "entry-1", "date": "2024-06-15", "desc": "Monitor", "amount": "750.00", "currency": "EUR"}
+        client = FakeHiBobClient(custom_tables={("emp-1", "purchases"): [entry, dict(entry)]})
+
+        log = await sync_purchases(mock_db, client)
+        assert log.status == "completed"
+        assert log.entries_found == 1
+        assert log.auto_adjusted == 1
+
+    @pytest.mark.asyncio
+    @patch("src.services.purchase_sync.write_audit_log", new_callable=AsyncMock)
+    @patch("src.services.purchase_sync.asyncio.sleep", new_callable=AsyncMock)
+    @patch("src.services.purchase_sync.load_settings_if_stale", new_callable=AsyncMock)
+    @patch("src.services.purchase_sync.get_setting")
+    @patch("src.services.purchase_sync.get_setting_int")
+    @patch("src.services.purchase_sync.refresh_budget_cache_many", new_callable=AsyncMock)
+    async def test_each_chunk_written_before_the_next(
+        self, mock_refresh, mock_get_setting_int, mock_get_setting, mock_load, mock_sleep, mock_audit, mock_db,
+    ):
+        def setting_side_effect(key):
+            return {
+                "hibob_purchase_table_id": "purchases",
+                "hibob_purchase_col_date": "date",
+                "hibob_purchase_col_description": "desc",
+                "hibob_purchase_col_amount": "amount",
+                "hibob_purchase_col_currency": "currency",
+            }.get(key, "")
+
+        mock_get_setting.side_effect = setting_side_effect
+        mock_get_setting_int.return_value = 500
+
+        first, second = make_user(hibob_id="emp-1"), make_user(hibob_id="emp-2")
+        unlinked_id = uuid.uuid4()
+        _mock_sync_db(mock_db, [first], [second])
+        # Old HiBob adjustments exist for the second user and an unlinked one
+        mock_db.execute.return_value.all.return_value = [(second.id,), (unlinked_id,)]
+
+        entry = {"date": "2024-06-15", "desc": "Monitor", "amount": "750.00", "currency": "EUR"}
+        client = FakeHiBobClient(custom_tables={
+            ("emp-1", "purchases"): [{"id": "entry-1", **entry}],
+            ("emp-2", "purchases"): [{"id": "entry-2", **entry}],
+        })
+
+        log = await sync_purchases(mock_db, client)
+
+        assert log.status == "completed"
+        assert log.auto_adjusted == 2
+        adjustment_inserts = [
+            c.args[1] for c in mock_db.execute.await_args_list
+            if len(c.args) == 2 and c.args[0].table.name == "budget_adjustments"
+        ]
+        assert [[row["user_id"] for row in rows] for rows in adjustment_inserts] == [[first.id], [second.id]]
+        assert [c.args[1] for c in mock_refresh.await_args_list] == [{first.id}, {second.id}, {unlinked_id}]
 
     @pytest.mark.asyncio
     async def test_fake_client_custom_tables(self):
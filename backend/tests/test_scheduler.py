@@ -0,0 +1,180 @@
+"""Tests for scheduler wakeup planning and bookkeeping."""
+import asyncio
+import time
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import src.services.scheduler as sched
+from src.services.scheduler import (
+    _CronSpec,
+    _next_fire,
+    _seconds_until_next_fire,
+    _should_run,
+    _Tick,
+)
+from tests.factories import make_user
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestNextFire:
+    def test_later_today(self):
+        spec = _CronSpec(minute=30, hours=frozenset({4}))
+        assert _next_fire(spec, _utc(2024, 6, 3, 1, 0)) == _utc(2024, 6, 3, 4, 30)
+
+    def test_rolls_to_next_day_once_passed(self):
+        spec = _CronSpec(minute=30, hours=frozenset({4}))
+        assert _next_fire(spec, _utc(2024, 6, 3, 4, 30)) == _utc(2024, 6, 4, 4, 30)
+
+    def test_next_hour_from_set(self):
+        spec = _CronSpec(hours=frozenset({8, 12, 16, 20}))
+        assert _next_fire(spec, _utc(2024, 6, 3, 12, 0)) == _utc(2024, 6, 3, 16, 0)
+
+    def test_every_hour(self):
+        spec = _CronSpec(minute=15)
+        assert _next_fire(spec, _utc(2024, 6, 3, 23, 20)) == _utc(2024, 6, 4, 0, 15)
+
+    def test_weekly(self):
+        # 2024-06-03 is a Monday; weekday 6 is the following Sunday
+        spec = _CronSpec(minute=0, hours=frozenset({2}), weekday=6)
+        assert _next_fire(spec, _utc(2024, 6, 3, 12, 0)) == _utc(2024, 6, 9, 2, 0)
+
+    def test_no_hours_never_fires(self):
+        assert _next_fire(_CronSpec(hours=frozenset()), _utc(2024, 6, 3)) is None
+
+
+class TestSecondsUntilNextFire:
+    def test_sleeps_until_earliest_task(self):
+        cfg = {
+            "delivery_reminder_hour": "8",
+            "aftership_sync_hours": "8,12,16,20",
+            "hibob_user_sync_hour": "3",
+            "cart_cleanup_hour": "4",
+            "cart_cleanup_minute": "30",
+            "hibob_purchase_sync_hours": "4,16",
+        }
+        assert _seconds_until_next_fire(_utc(2024, 6, 3, 4, 20), cfg) == 10 * 60
+
+    def test_capped(self):
+        cfg = {"aftership_sync_hours": "8", "delivery_reminder_hour": "8", "hibob_user_sync_hour": "8",
+               "cart_cleanup_hour": "8", "hibob_purchase_sync_hours": "8"}
+        assert _seconds_until_next_fire(_utc(2024, 6, 3, 9, 0), cfg) == 15 * 60
+
+    def test_malformed_schedules_skipped(self, monkeypatch, caplog):
+        monkeypatch.setattr(sched, "_HIBOB_ENABLED", False)
+        monkeypatch.setattr(sched, "_backup_cron_cache", None)
+        cfg = {
+            "delivery_reminder_hour": "24",
+            "aftership_sync_hours": "8,x",
+            "cart_cleanup_hour": "4",
+            "cart_cleanup_minute": "75",
+            "backup_schedule_enabled": "true",
+            "backup_schedule_hour": "4",
+            "backup_schedule_minute": "30",
+        }
+
+        assert _seconds_until_next_fire(_utc(2024, 6, 3, 4, 20), cfg) == 10 * 60
+        for task_name in ("delivery_reminders", "aftership_sync", "cart_cleanup"):
+            assert f"malformed schedule for '{task_name}'" in caplog.text
+
+
+def _week(now):
+    return _Tick.at(now).week
+
+
+def _hour_slot(now):
+    return _Tick.at(now).hour_slot
+
+
+class TestRunKeys:
+    def test_week_key_changes_on_monday(self):
+        # 2024-06-09 is a Sunday
+        assert _week(_utc(2024, 6, 3)) == _week(_utc(2024, 6, 9, 23))
+        assert _week(_utc(2024, 6, 10)) == _week(_utc(2024, 6, 9)) + 1
+
+    def test_hour_key_distinct_across_days(self):
+        assert _hour_slot(_utc(2024, 6, 3, 23)) + 1 == _hour_slot(_utc(2024, 6, 4, 0))
+
+    def test_should_run_once_per_key(self, monkeypatch):
+        monkeypatch.setattr(sched, "_last_run", type(sched._last_run)())
+
+        key = _hour_slot(_utc(2024, 6, 3, 8))
+        assert _should_run("aftership", key) is True
+        assert _should_run("aftership", key) is False
+        assert _should_run("aftership", key + 1) is True
+
+
+class TestAuditUser:
+    @pytest.mark.asyncio
+    async def test_cached_within_ttl(self, mock_db, monkeypatch):
+        staff = make_user(role="admin")
+        lookup = AsyncMock(return_value=staff.id)
+        monkeypatch.setattr(sched, "_audit_staff", None)
+        monkeypatch.setattr(sched.user_repo, "get_first_active_staff_id", lookup)
+
+        assert await sched._get_audit_user(mock_db) == staff.id
+        assert await sched._get_audit_user(mock_db) == staff.id
+        lookup.assert_awaited_once()
+
+        monkeypatch.setattr(sched, "_audit_staff", (time.monotonic() - sched._AUDIT_STAFF_TTL, staff.id))
+        await sched._get_audit_user(mock_db)
+        assert lookup.await_count == 2
+
+
+class TestNotifyStaff:
+    @pytest.mark.asyncio
+    async def test_failure_logged_not_raised(self, monkeypatch, caplog):
+        factory = MagicMock()
+        factory.return_value.__aenter__ = AsyncMock(return_value=AsyncMock())
+        factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        notify = AsyncMock(side_effect=[1, RuntimeError("smtp down")])
+        monkeypatch.setattr(sched, "async_session_factory", factory)
+        monkeypatch.setattr(sched, "notify_staff_email", notify)
+
+        await sched._notify_staff([
+            {"event": "hibob.sync", "subject": "s", "template_name": "t", "context": {}},
+            {"event": "hibob.purchase_review", "subject": "s", "template_name": "t", "context": {}},
+        ])
+
+        assert notify.await_count == 2
+        assert factory.call_count == 2
+        assert "'hibob.purchase_review' notification" in caplog.text
+
+
+class TestSettingsListener:
+    def test_reschedules_only_for_schedule_keys(self, monkeypatch):
+        monkeypatch.setattr(sched, "_reschedule", asyncio.Event())
+
+        sched._on_settings_changed(frozenset({"company_name", "smtp_host"}))
+        assert not sched._reschedule.is_set()
+
+        sched._on_settings_changed(frozenset({"company_name", "backup_schedule_hour"}))
+        assert sched._reschedule.is_set()
+
+
+class TestSchedulerLoop:
+    @pytest.mark.asyncio
+    async def test_planning_error_does_not_stop_loop(self, monkeypatch, caplog):
+        ticks = []
+
+        async def task(tick, cfg):
+            ticks.append(tick)
+            if len(ticks) < 2:
+                sched.reschedule()
+            else:
+                raise asyncio.CancelledError
+
+        monkeypatch.setattr(sched, "_reschedule", asyncio.Event())
+        monkeypatch.setattr(sched, "TASK_GROUPS", [[("probe", task)]])
+        monkeypatch.setattr(sched, "_seconds_until_next_fire", MagicMock(side_effect=RuntimeError("boom")))
+        sched.reschedule()
+
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(sched._scheduler_loop(), timeout=5)
+
+        assert len(ticks) == 2
+        assert "failed to plan its next wakeup" in caplog.text
@@ -1,13 +1,22 @@
 """Tests for settings service - caching and defaults."""
+import asyncio
+import time
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from sqlalchemy.dialects.postgresql import Insert
+from sqlalchemy.dialects.postgresql.dml import OnConflictDoUpdate
 
+import src.services.settings_service as svc
 from src.services.settings_service import (
     DEFAULT_SETTINGS,
     get_cached_settings,
     get_setting,
     get_setting_int,
+    load_settings_if_stale,
+    on_settings_changed,
+    seed_defaults,
+    update_settings,
 )
 
 
@@ -24,7 +33,6 @@ class TestDefaults:
 
 class TestGetCachedSettings:
     def test_returns_defaults_when_cache_empty(self):
-        import src.services.settings_service as svc
         original = svc._cache.copy()
         svc._cache.clear()
         try:
@@ -34,19 +42,143 @@ class TestGetCachedSettings:
         finally:
             svc._cache.update(original)
 
-    def test_returns_copy(self):
-        result1 = get_cached_settings()
-        result2 = get_cached_settings()
-        assert result1 is not result2  # must be a copy
+    def test_returns_read_only_view(self):
+        result = get_cached_settings()
+        with pytest.raises(TypeError):
+            result["company_name"] = "Changed"  # type: ignore[index]
 
 
 class TestGetSettingInt:
     def test_returns_integer(self):
-        import src.services.settings_service as svc
         svc._cache["budget_initial_cents"] = "75000"
         assert get_setting_int("budget_initial_cents") == 75000
 
     def test_missing_key_returns_zero(self):
-        import src.services.settings_service as svc
         svc._cache.pop("nonexistent", None)
         assert get_setting_int("nonexistent") == 0
+
+
+class TestLoadSettingsIfStale:
+    @pytest.mark.asyncio
+    async def test_skips_reload_when_recent(self, mock_db, monkeypatch):
+        monkeypatch.setattr(svc, "_cache", {**DEFAULT_SETTINGS, "company_name": "Cached"})
+        monkeypatch.setattr(svc, "_cache_loaded_at", time.monotonic())
+
+        result = await load_settings_if_stale(mock_db)
+
+        assert result["company_name"] == "Cached"
+        mock_db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_reloads_when_stale(self, mock_db, monkeypatch):
+        monkeypatch.setattr(svc, "_cache", dict(svc._cache))
+        monkeypatch.setattr(svc, "_cache_loaded_at", 0)
+        db_result = MagicMock()
+        db_result.scalars.return_value.all.return_value = []
+        mock_db.execute = AsyncMock(return_value=db_result)
+
+        result = await load_settings_if_stale(mock_db)
+
+        mock_db.execute.assert_awaited_once()
+        assert result["company_name"] == DEFAULT_SETTINGS["company_name"]
+
+
+class TestSettingsVersion:
+    def test_minus_one_while_serving_defaults(self, monkeypatch):
+        monkeypatch.setattr(svc, "_cache", {})
+
+        assert svc.settings_version() == -1
+
+    @pytest.mark.asyncio
+    async def test_bumped_on_reload(self, mock_db, monkeypatch):
+        monkeypatch.setattr(svc, "_cache", dict(svc._cache))
+        monkeypatch.setattr(svc, "_cache_loaded_at", svc._cache_loaded_at)
+        monkeypatch.setattr(svc, "_settings_version", 5)
+        db_result = MagicMock()
+        db_result.scalars.return_value.all.return_value = []
+        mock_db.execute = AsyncMock(return_value=db_result)
+
+        await svc.load_settings(mock_db)
+
+        assert svc.settings_version() == 6
+
+
+class TestSeedDefaults:
+    @pytest.mark.asyncio
+    async def test_adds_only_missing_keys_in_one_query(self, mock_db):
+        db_result = MagicMock()
+        db_result.scalars.return_value.all.return_value = ["company_name"]
+        mock_db.execute = AsyncMock(return_value=db_result)
+        mock_db.add_all = MagicMock()
+
+        await seed_defaults(mock_db)
+
+        mock_db.execute.assert_awaited_once()
+        [added] = mock_db.add_all.call_args.args
+        assert {s.key for s in added} == set(DEFAULT_SETTINGS) - {"company_name"}
+
+
+class TestUpdateSettings:
+    @pytest.mark.asyncio
+    async def test_single_upsert_statement(self, mock_db, monkeypatch):
+        monkeypatch.setattr(svc, "_cache", dict(DEFAULT_SETTINGS))
+
+        await svc.update_settings(mock_db, {"backup_schedule_hour": "5", "backup_schedule_minute": "15"})
+
+        mock_db.execute.assert_awaited_once()
+        stmt = mock_db.execute.await_args.args[0]
+        assert isinstance(stmt, Insert)
+        conflict = stmt._post_values_clause
+        assert isinstance(conflict, OnConflictDoUpdate)
+        assert [col.key for col in conflict.inferred_target_elements] == ["key"]
+        assert get_setting("backup_schedule_minute") == "15"
+
+    @pytest.mark.asyncio
+    async def test_invalidates_parsed_ints(self, mock_db, monkeypatch):
+        monkeypatch.setattr(svc, "_cache", dict(DEFAULT_SETTINGS))
+        monkeypatch.setattr(svc, "_cache_loaded_at", svc.time.monotonic())
+        monkeypatch.setattr(svc, "_int_cache", {})
+        assert get_setting_int("cart_stale_days") == 30
+
+        await svc.update_settings(mock_db, {"cart_stale_days": "14"})
+
+        assert get_setting_int("cart_stale_days") == 14
+
+    @pytest.mark.asyncio
+    async def test_notifies_listeners_with_changed_keys(self, mock_db, monkeypatch):
+        monkeypatch.setattr(svc, "_cache", dict(DEFAULT_SETTINGS))
+        monkeypatch.setattr(svc, "_change_listeners", [])
+        listener = MagicMock()
+        on_settings_changed(listener)
+        on_settings_changed(listener)
+
+        await update_settings(mock_db, {"cart_cleanup_hour": "5", "company_name": "X"})
+
+        listener.assert_called_once_with(frozenset({"cart_cleanup_hour", "company_name"}))
+
+    @pytest.mark.asyncio
+    async def test_existing_views_keep_their_snapshot(self, mock_db, monkeypatch):
+        monkeypatch.setattr(svc, "_cache", dict(DEFAULT_SETTINGS))
+        monkeypatch.setattr(svc, "_cache_loaded_at", svc.time.monotonic())
+        snapshot = get_cached_settings()
+
+        await update_settings(mock_db, {"cart_cleanup_hour": "5"})
+
+        assert snapshot["cart_cleanup_hour"] == DEFAULT_SETTINGS["cart_cleanup_hour"]
+        assert get_cached_settings()["cart_cleanup_hour"] == "5"
+
+
+class TestStaleCache:
+    @pytest.mark.asyncio
+    async def test_serves_stale_values_and_refreshes_in_background(self, monkeypatch):
+        refresh = AsyncMock()
+        monkeypatch.setattr(svc, "_refresh_settings", refresh)
+        monkeypatch.setattr(svc, "_refresh_task", None)
+        monkeypatch.setattr(svc, "_cache", {**DEFAULT_SETTINGS, "company_name": "Configured"})
+        monkeypatch.setattr(svc, "_cache_loaded_at", 0)
+
+        assert get_setting("company_name") == "Configured"
+        assert get_cached_settings()["company_name"] == "Configured"
+        await asyncio.sleep(0)
+
+        refresh.assert_awaited_once()
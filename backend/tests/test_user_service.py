@@ -0,0 +1,188 @@
+"""Tests for the admin user detail loaders."""
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import Update
+
+import src.core.database as database
+from src.core.exceptions import BadRequestError, NotFoundError
+from src.models.dto.user import UserDetailAdjustment, UserDetailPurchaseReview
+from src.models.orm.user import User
+from src.services.user_service import (
+    _load_user_history,
+    delete_budget_override,
+    get_avatar_url,
+    get_departments,
+    get_user_detail,
+    invalidate_departments_cache,
+    update_budget_override,
+)
+from tests.factories import make_user
+
+
+class TestLoadUserHistory:
+    @pytest.mark.asyncio
+    async def test_partitions_union_rows(self, mock_db):
+        adj, review = MagicMock(kind="adj"), MagicMock(kind="pr")
+        result = MagicMock()
+        result.all.return_value = [adj, review]
+        mock_db.execute = AsyncMock(return_value=result)
+
+        adjustments, reviews = await _load_user_history(mock_db, uuid.uuid4())
+
+        mock_db.execute.assert_awaited_once()
+        assert adjustments == [adj]
+        assert reviews == [review]
+
+    @pytest.mark.asyncio
+    async def test_rows_carry_response_model_fields(self, mock_db):
+        result = MagicMock()
+        result.all.return_value = []
+        mock_db.execute = AsyncMock(return_value=result)
+
+        await _load_user_history(mock_db, uuid.uuid4())
+
+        columns = set(mock_db.execute.await_args.args[0].selected_columns.keys())
+        assert UserDetailAdjustment.model_fields.keys() <= columns
+        assert UserDetailPurchaseReview.model_fields.keys() <= columns
+
+
+class TestGetAvatarUrl:
+    def _mock_row(self, mock_db, avatar_url):
+        result = MagicMock()
+        result.one_or_none.return_value = (
+            MagicMock(avatar_url=avatar_url) if avatar_url is not None else None
+        )
+        mock_db.execute = AsyncMock(return_value=result)
+
+    @pytest.mark.asyncio
+    async def test_reads_only_avatar_column(self, mock_db):
+        self._mock_row(mock_db, "https://www.gravatar.com/avatar/abc")
+
+        assert await get_avatar_url(mock_db, uuid.uuid4()) == "https://www.gravatar.com/avatar/abc"
+        stmt = mock_db.execute.await_args.args[0]
+        assert list(stmt.selected_columns) == [User.avatar_url]
+
+    @pytest.mark.asyncio
+    async def test_missing_user(self, mock_db):
+        self._mock_row(mock_db, None)
+
+        with pytest.raises(NotFoundError):
+            await get_avatar_url(mock_db, uuid.uuid4())
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("url", [
+        "https://evil.example.com/a.png",
+        "http://www.gravatar.com/avatar/abc",
+        "https://www.gravatar.com.evil.io/avatar/abc",
+        "https://www.gravatar.com@evil.io/avatar/abc",
+    ])
+    async def test_disallowed_url(self, mock_db, url):
+        self._mock_row(mock_db, url)
+
+        with pytest.raises(BadRequestError):
+            await get_avatar_url(mock_db, uuid.uuid4())
+
+
+class TestBudgetOverrideWrites:
+    @pytest.mark.asyncio
+    async def test_update_scoped_to_user_in_one_statement(self, mock_db):
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = None
+        mock_db.execute = AsyncMock(return_value=result)
+
+        with pytest.raises(NotFoundError):
+            await update_budget_override(mock_db, uuid.uuid4(), uuid.uuid4(), {"reason": "x"})
+
+        mock_db.execute.assert_awaited_once()
+        stmt = mock_db.execute.await_args.args[0]
+        assert isinstance(stmt, Update)
+        assert [col.key for col in stmt._values] == ["reason"]
+        assert {clause.left.key for clause in stmt.whereclause.clauses} == {"id", "user_id"}
+        assert stmt._returning
+
+    @pytest.mark.asyncio
+    async def test_delete_not_owned_raises(self, mock_db):
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = None
+        mock_db.execute = AsyncMock(return_value=result)
+
+        with pytest.raises(NotFoundError):
+            await delete_budget_override(mock_db, uuid.uuid4(), uuid.uuid4())
+        mock_db.execute.assert_awaited_once()
+
+
+class TestDepartmentsCache:
+    @pytest.mark.asyncio
+    async def test_cached_until_invalidated(self, mock_db):
+        invalidate_departments_cache()
+        result = MagicMock()
+        result.all.return_value = ["Engineering", "Sales"]
+        mock_db.scalars = AsyncMock(return_value=result)
+
+        assert await get_departments(mock_db) == ["Engineering", "Sales"]
+        assert await get_departments(mock_db) == ["Engineering", "Sales"]
+        assert mock_db.scalars.await_count == 1
+
+        invalidate_departments_cache()
+        await get_departments(mock_db)
+        assert mock_db.scalars.await_count == 2
+        invalidate_departments_cache()
+
+
+class TestUserDetailSideSessions:
+    def _session_factory(self, active, peak):
+        async def enter():
+            active.append(None)
+            peak[0] = max(peak[0], len(active))
+            await asyncio.sleep(0)
+            return AsyncMock()
+
+        async def leave(*exc):
+            active.pop()
+            return False
+
+        factory = MagicMock()
+        factory.return_value.__aenter__ = AsyncMock(side_effect=enter)
+        factory.return_value.__aexit__ = AsyncMock(side_effect=leave)
+        return factory
+
+    @pytest.mark.asyncio
+    async def test_sections_load_concurrently_on_side_sessions(self, mock_db, monkeypatch):
+        user = make_user()
+        monkeypatch.setattr("src.services.user_service.user_repo.get_by_id", AsyncMock(return_value=user))
+        history = MagicMock()
+        history.all.return_value = []
+        mock_db.execute = AsyncMock(return_value=history)
+        peak = [0]
+        factory = self._session_factory([], peak)
+
+        with (
+            patch.object(database, "async_session_factory", factory),
+            patch("src.services.user_service.order_service.get_recent_orders", AsyncMock(return_value=[])),
+            patch("src.services.user_service.budget_service.get_live_totals_cents", AsyncMock(return_value=(0, 0))),
+            patch("src.services.user_service.budget_service.get_budget_rules", AsyncMock(return_value=[])),
+            patch("src.services.user_service.budget_service.get_user_overrides", AsyncMock(return_value=[])),
+        ):
+            detail = await get_user_detail(mock_db, user.id)
+
+        assert detail["user"] is user
+        assert factory.call_count == 3
+        assert peak[0] == 3
+        mock_db.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_side_sessions_capped(self, monkeypatch):
+        active, peak = [], [0]
+        monkeypatch.setattr(database, "async_session_factory", self._session_factory(active, peak))
+        monkeypatch.setattr(database, "_side_sessions", asyncio.Semaphore(2))
+
+        async def hold():
+            async with database.side_session():
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*(hold() for _ in range(5)))
+
+        assert peak[0] == 2